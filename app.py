@@ -1,22 +1,46 @@
 import os
+import re
+import atexit
+import csv
 import json
 import io
+import hashlib
+import itertools
+import logging
+import multiprocessing
 import tempfile
-from datetime import datetime
-import uuid
-from flask import Flask, request, jsonify, render_template, send_file, Response, send_from_directory
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime, timedelta
+from secrets import token_hex
+from flask import Flask, Request, request, jsonify, render_template, send_file, Response, send_from_directory, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from dotenv import load_dotenv
 import requests
-import gdown
-from services.file_processor import extract_text_from_file
-from services.ai_service import generate_interview_questions, analyze_candidate_with_ai, format_job_description
-from services.resume_parser import ResumeParser
-from services.candidate_scorer import CandidateScorer
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from werkzeug.exceptions import NotFound, RequestEntityTooLarge
+from werkzeug.utils import safe_join
+from urllib.parse import quote
+from services.file_processor import extract_text_from_file, extract_text_from_bytes, file_fingerprint
+from services.ai_service import generate_interview_questions, analyze_candidate_with_ai, format_job_description, ANALYSIS_BATCH_SIZE
+from services.resume_parser import ResumeParser, parse_resume_file
+from services.candidate_scorer import CandidateScorer, candidate_resume_text
 from services.storage_service import StorageService
 from services.email_service import EmailService
 from services.cache_service import CacheService
 
+# Try importing orjson for faster JSON serialization, fall back to stdlib json
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 load_dotenv()
 
 # Initialize services
@@ -26,43 +50,253 @@ storage_service = StorageService()
 email_service = EmailService()
 cache_service = CacheService()
 
+# Flush the pending admin digest when a process exits (gunicorn recycling or deploys,
+# and worker.py, which imports these services from here)
+atexit.register(email_service.shutdown)
+
+# Process pool for parsing uploaded resumes in /api/rank (created on first use).
+# Every gunicorn worker owns one, so it is capped rather than sized to all cores.
+PARSE_POOL_WORKERS = min(8, os.cpu_count() or 1)
+# Workers are started from a clean forkserver (or spawned) rather than forked from
+# this process, whose other threads may hold locks (logging, urllib3, SMTP) that a
+# forked child would inherit locked
+PARSE_POOL_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+# Thread pool for fire-and-forget work that should not hold a request worker
+background_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='background')
+
+# Bounded pool for webhook application processing (download + parse + AI scoring),
+# kept separate so slow applications cannot starve other background work
+application_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='application')
+
+# Its queue is unbounded and held in memory, so the backlog (queued + running) is
+# counted and a warning logged past this size
+APPLICATION_BACKLOG_WARNING = int(os.environ.get('APPLICATION_BACKLOG_WARNING', 20))
+_application_backlog = 0
+_application_backlog_lock = threading.Lock()
+
+# Disk writes of uploads parsed from memory, overlapped with parsing/scoring
+upload_writer = ThreadPoolExecutor(max_workers=4, thread_name_prefix='upload-writer')
+
+# Shared connection pool for outbound HTTP (keep-alive, so TLS handshakes are reused)
+_http_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=0)
+
+# Shared HTTP session for outbound webhook / Apps Script calls
+zapier_session = requests.Session()
+zapier_session.mount('https://', _http_adapter)
+zapier_session.mount('http://', _http_adapter)
+
+
+# Resume downloads are idempotent GETs, so they get their own pool that retries
+# connection errors and transient statuses with backoff (0.3s, 0.6s, 1.2s).
+# raise_on_status=False hands back the last response for the normal status check.
+_download_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({'GET', 'HEAD'}),
+        raise_on_status=False
+    )
+)
+
+
+def new_download_session():
+    """
+    Session for one resume download: its own cookie jar (Drive confirmation
+    tokens must not leak between downloads) on top of the shared download pool
+    """
+    session = requests.Session()
+    session.mount('https://', _download_adapter)
+    session.mount('http://', _download_adapter)
+    return session
+
+
+def response_preview(response, limit=500):
+    """
+    First bytes of an HTTP response body for logging. Avoids response.text, which
+    decodes the whole body and runs charset detection when no charset is declared.
+    """
+    return response.content[:limit].decode('utf-8', errors='replace')
+
+
+@lru_cache(maxsize=1)
+def _iso_for_second(epoch_second):
+    return datetime.fromtimestamp(epoch_second).isoformat()
+
+
+def now_iso():
+    """Current local time as a second-resolution ISO string, formatted once per second"""
+    return _iso_for_second(int(time.time()))
+
+
+def json_dumps_bytes(obj):
+    """Serialize obj to UTF-8 JSON bytes (orjson when available)"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+def json_loads(data):
+    """Parse JSON from bytes or str (orjson when available)"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson, using the stdlib for types orjson rejects.
+    Dates are passed through to Flask's default handler so they keep the HTTP-date
+    format the default provider sends (orjson would emit ISO 8601).
+    """
+    
+    def dumps(self, obj, **kwargs):
+        try:
+            return orjson.dumps(
+                obj, default=self.default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+            ).decode('utf-8')
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+class UploadRequest(Request):
+    """
+    Request that spools large /api/rank and /api/upload-resume uploads into
+    UPLOAD_FOLDER as the multipart body is parsed, so rank_candidates can hard-link
+    them into place and upload_resume can parse them where they are, instead of
+    copying a second time. The spool file keeps the upload's extension (the parser
+    relies on it) and is deleted when the request closes.
+    """
+    
+    SPOOLED_ENDPOINTS = frozenset({'rank_candidates', 'upload_resume'})
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.endpoint in self.SPOOLED_ENDPOINTS and (total_content_length or 0) > IN_MEMORY_PARSE_LIMIT:
+            return tempfile.NamedTemporaryFile(dir=UPLOAD_FOLDER, prefix='spool_', suffix=_safe_extension(filename or ''))
+        return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
+
 app = Flask(__name__, static_folder='static', template_folder='templates')
+app.request_class = UploadRequest
+if HAS_ORJSON:
+    app.json = ORJSONProvider(app)
 CORS(app)
 
+# Serverless/cloud platform (Vercel, Railway): background threads may be killed and
+# local files are ephemeral. Read once; the environment does not change at runtime.
+IS_SERVERLESS = bool(os.environ.get('VERCEL') or os.environ.get('RAILWAY_ENVIRONMENT'))
+
+# LOG_LEVEL=DEBUG adds per-request diagnostics (download status, score details,
+# webhook replies). Serverless defaults to WARNING to keep per-request chatter out
+# of the platform logs; messages are only formatted when their level is enabled.
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'WARNING' if IS_SERVERLESS else 'INFO').upper()
+logging.basicConfig(level=getattr(logging, LOG_LEVEL, logging.INFO), format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+logger = logging.getLogger(__name__)
+
 # Configure upload folder
 # Use /tmp for Vercel/Cloud, or local 'uploads' folder for development
-if os.environ.get('VERCEL') or os.environ.get('RAILWAY_ENVIRONMENT'):
+if IS_SERVERLESS:
     UPLOAD_FOLDER = '/tmp'
 else:
     UPLOAD_FOLDER = 'uploads'
-    if not os.path.exists(UPLOAD_FOLDER):
-        os.makedirs(UPLOAD_FOLDER)
+    try:
+        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    except OSError as e:
+        # Still importable from a read-only checkout; uploads will fail until fixed
+        logger.warning("⚠️ Could not create upload folder %s: %s", UPLOAD_FOLDER, e)
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
-ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'txt'}
+# Let a front proxy deliver /uploads files instead of a Flask worker:
+# USE_X_SENDFILE=1 for Apache/lighttpd (X-Sendfile), or UPLOADS_ACCEL_REDIRECT set to
+# an nginx `internal` location aliased to the upload folder (X-Accel-Redirect)
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE') == '1'
+UPLOADS_ACCEL_REDIRECT = os.environ.get('UPLOADS_ACCEL_REDIRECT')
+
+# Types the text extractor can read (legacy .doc is binary and would be misread as text)
+ALLOWED_EXTENSIONS = frozenset({'pdf', 'docx', 'txt'})
+
+# Uploads up to this size are parsed straight from memory instead of via a file on disk
+IN_MEMORY_PARSE_LIMIT = 512 * 1024
+
+# Max /api/rank scoring batches (one AI call each) in flight at once per request
+RANK_SCORING_WORKERS = 4
+
+# Google Drive file ID formats (/file/d/<id>/view and ?id=<id>).
+# One alternation scans the URL once; /d/ sits in the path, so it is found before any id= query.
+DRIVE_FILE_ID_RE = re.compile(r'(?:/d/|id=)([a-zA-Z0-9_-]+)')
+
+# Content-Type substring -> extension for downloaded resumes, checked in order (default .pdf)
+DOWNLOAD_MIME_EXTENSIONS = (
+    ('application/pdf', '.pdf'),
+    ('wordprocessingml', '.docx'),
+    ('msword', '.docx'),
+    ('text/plain', '.txt'),
+)
+
+# Leading bytes of a downloaded resume checked for an HTML page instead of a file
+HTML_SNIFF_BYTES = 64
+
+# (connect, read) timeouts for resume downloads: fail fast on unreachable hosts,
+# but allow slow bodies since read applies per chunk, not to the whole file
+RESUME_DOWNLOAD_TIMEOUT = (5, 30)
+
+# Redis list the webhook hands applications to when a separate worker is deployed (worker.py)
+APPLICATION_QUEUE = 'queue:applications'
+
+# Applications still 'pending' this long after they were received are treated as lost
+# (a worker crashed, was recycled or redeployed mid-application) and processed again
+STALE_PENDING_MINUTES = int(os.environ.get('STALE_PENDING_MINUTES', 30))
+
+# Standard fields added to every generated application form
+STANDARD_APPLICATION_FIELDS = (
+    {'field': 'Full Name', 'type': 'text', 'required': True},
+    # Email is collected automatically by Google Forms via setCollectEmail(true)
+    {'field': 'Phone Number', 'type': 'phone', 'required': True},
+    {'field': 'Resume/CV Upload', 'type': 'file', 'required': True},
+    {'field': 'LinkedIn Profile', 'type': 'url', 'required': False},
+    {'field': 'Years of Experience', 'type': 'number', 'required': True},
+    {'field': 'Current/Previous Company', 'type': 'text', 'required': False},
+    {'field': 'Expected Salary', 'type': 'text', 'required': False},
+    {'field': 'Availability to Start', 'type': 'date', 'required': True},
+)
 
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    """Check the extension against ALLOWED_EXTENSIONS without splitting the name"""
+    _, dot, ext = filename.rpartition('.')
+    return bool(dot) and ext.lower() in ALLOWED_EXTENSIONS
 
 
 # ============================================================
 # HEALTH CHECK & DIAGNOSTICS
 # ============================================================
+# Deployment facts reported by /api/health; none of these change after startup
+HEALTH_STATIC_FIELDS = {
+    'status': 'healthy',
+    'environment': 'vercel' if os.environ.get('VERCEL') else 'local',
+    'database': 'postgresql' if storage_service.is_postgres else 'sqlite',
+    'cache': 'redis' if cache_service.is_redis else 'memory',
+}
+
+
 @app.route('/api/health')
 def health_check():
     """Health check endpoint for monitoring and deployment verification"""
-    is_vercel = bool(os.environ.get('VERCEL'))
-    is_postgres = storage_service.is_postgres
-    
     return jsonify({
-        'status': 'healthy',
-        'environment': 'vercel' if is_vercel else 'local',
-        'database': 'postgresql' if is_postgres else 'sqlite',
-        'cache': 'redis' if cache_service.is_redis else 'memory',
+        **HEALTH_STATIC_FIELDS,
         'email_queue': email_service.get_queue_status(),
-        'timestamp': datetime.now().isoformat()
+        'application_backlog': _application_backlog,
+        'timestamp': now_iso()
     })
 
 
@@ -114,7 +348,22 @@ def analytics():
 
 @app.route('/uploads/<filename>')
 def uploaded_file(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    # Uploads are stored under unique names and never modified, so browsers can
+    # reuse them: immutable skips revalidation (even on reload) while fresh, and
+    # conditional=True answers revalidations with 304 once max-age has passed.
+    # Resumes are personal data, so only the browser (not shared caches) may keep them.
+    if UPLOADS_ACCEL_REDIRECT:
+        # nginx sends the file (and handles Range/conditional requests) itself
+        path = safe_join(UPLOAD_FOLDER, filename)
+        if path is None or not os.path.isfile(path):
+            raise NotFound()
+        response = Response(headers={'X-Accel-Redirect': f"{UPLOADS_ACCEL_REDIRECT.rstrip('/')}/{quote(filename)}"})
+        response.cache_control.max_age = 3600
+    else:
+        response = send_from_directory(UPLOAD_FOLDER, filename, conditional=True, max_age=3600)
+    response.cache_control.private = True
+    response.cache_control.immutable = True
+    return response
 
 
 @app.route('/api/jobs', methods=['GET'])
@@ -126,9 +375,44 @@ def get_jobs():
         return jsonify({'jobs': cached, '_cached': True})
     
     # Fetch from database and cache
+    return jsonify({'jobs': _load_jobs()})
+
+
+def _load_jobs():
+    """Read all jobs from the database and refresh the jobs cache"""
     jobs = storage_service.get_all_jobs()
     cache_service.set_jobs(jobs)
-    return jsonify({'jobs': jobs})
+    return jobs
+
+
+def _active_jobs(jobs):
+    """Jobs that are still accepting applications"""
+    return [job for job in jobs if job.get('status') == 'active']
+
+
+@lru_cache(maxsize=32)
+def _title_pattern(titles):
+    """
+    One compiled alternation over a set of job titles (cached per title set), longest
+    first so the most specific title wins where several start at the same position
+    """
+    return re.compile('|'.join(map(re.escape, sorted(titles, key=len, reverse=True))))
+
+
+def _match_job_by_title(jobs, text):
+    """
+    Job whose title appears in text, found in a single regex pass. The title that
+    starts earliest wins (so "Senior Engineer" beats a separate "Engineer" job);
+    jobs sharing a title resolve to the first one listed (the newest).
+    """
+    by_title = {}
+    for job in jobs:
+        if job.get('title'):
+            by_title.setdefault(job['title'], job)
+    if not by_title or not text:
+        return None
+    match = _title_pattern(tuple(by_title)).search(text)
+    return by_title[match.group()] if match else None
 
 @app.route('/api/jobs/<job_id>', methods=['GET'])
 def get_job(job_id):
@@ -160,7 +444,7 @@ def get_job_candidates(job_id):
 @app.route('/api/jobs/<job_id>/close', methods=['POST'])
 def close_job(job_id):
     """Mark a job as closed (inactive) and stop Google Form responses"""
-    print(f"Attempting to close job: {job_id}")
+    logger.info("Attempting to close job: %s", job_id)
     try:
         # 1. Get job details to find script_url and edit_url
         job = storage_service.get_job(job_id)
@@ -172,16 +456,16 @@ def close_job(job_id):
         edit_url = job.get('edit_url')
         
         if script_url and edit_url:
-            print(f"Closing Google Form via Script: {script_url}")
+            logger.info("Closing Google Form via Script: %s", script_url)
             try:
                 payload = {
                     'action': 'close_form',
                     'form_url': edit_url
                 }
-                resp = requests.post(script_url, json=payload, timeout=10)
-                print(f"Google Script Response: {resp.text}")
+                resp = zapier_session.post(script_url, json=payload, timeout=10)
+                logger.debug("Google Script Response: %s", response_preview(resp))
             except Exception as e:
-                print(f"Warning: Failed to close Google Form remotely: {e}")
+                logger.warning("Failed to close Google Form remotely: %s", e)
                 # We continue to close it locally anyway
 
         # 3. Update local status
@@ -190,14 +474,14 @@ def close_job(job_id):
             # Invalidate cache
             cache_service.invalidate_jobs()
             cache_service.delete(f'job:{job_id}')
-            print(f"Successfully closed job: {job_id}")
+            logger.info("Successfully closed job: %s", job_id)
             return jsonify({'success': True})
         else:
-            print(f"Failed to close job: {job_id} (DB error)")
+            logger.error("Failed to close job: %s (DB error)", job_id)
             return jsonify({'success': False, 'error': 'Failed to update job status'}), 500
             
     except Exception as e:
-        print(f"Exception closing job {job_id}: {e}")
+        logger.error("Exception closing job %s: %s", job_id, e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -212,15 +496,15 @@ def delete_job(job_id):
             edit_url = job.get('edit_url')
             
             if script_url and edit_url:
-                print(f"Deleting Google Form via Script: {script_url}")
+                logger.info("Deleting Google Form via Script: %s", script_url)
                 try:
                     payload = {
                         'action': 'delete_form',
                         'form_url': edit_url
                     }
-                    requests.post(script_url, json=payload, timeout=10)
+                    zapier_session.post(script_url, json=payload, timeout=10)
                 except Exception as e:
-                    print(f"Warning: Failed to delete Google Form remotely: {e}")
+                    logger.warning("Failed to delete Google Form remotely: %s", e)
 
         success = storage_service.delete_job(job_id)
         if success:
@@ -241,63 +525,61 @@ def rank_candidates():
         if not job_description:
             return jsonify({'error': 'Job description is required'}), 400
             
-        candidates_data = []
-        
+        # Save all uploads first (cheap I/O), then parse them in parallel
+        saved_files = []
+        upload_keys = []
+        pending_writes = []
         if 'resumes' in request.files:
             files = request.files.getlist('resumes')
             for file in files:
                 if file and file.filename and allowed_file(file.filename):
-                    # Generate unique filename to prevent overwrites
-                    ext = file.filename.rsplit('.', 1)[1].lower()
-                    unique_filename = f"{uuid.uuid4().hex}_{file.filename}"
-                    filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-                    file.save(filepath)
+                    # Small uploads are parsed straight from memory; the copy kept for
+                    # /uploads is written in the background instead of before parsing
+                    data = file.stream.read(IN_MEMORY_PARSE_LIMIT + 1)
+                    if len(data) <= IN_MEMORY_PARSE_LIMIT:
+                        digest = _content_digest(data)
+                    else:
+                        data = None
+                        spool_path = _spooled_upload_path(file)
+                        digest = file_fingerprint(spool_path) if spool_path else _stream_digest(file.stream)
                     
-                    try:
-                        # Parse resume
-                        candidate_info = resume_parser.parse_resume(filepath, file.filename)
-                        
-                        # If parsing failed or returned error
-                        if 'error' in candidate_info:
-                            print(f"Error parsing {file.filename}: {candidate_info['error']}")
-                            # Still add to list so admin can see it failed and view file
-                            candidates_data.append({
-                                'candidate_name': 'Parsing Failed',
-                                'total_score': 0,
-                                'breakdown': {'skills_match': 0, 'experience': 0, 'education': 0},
-                                'feedback': f"Could not parse resume. Error: {candidate_info['error']}",
-                                'file_url': f"/uploads/{unique_filename}",
-                                'original_filename': file.filename
-                            })
-                            continue
-                            
-                        # Score candidate
-                        score_result = candidate_scorer.score_candidate(
-                            candidate_info, 
-                            job_description, 
-                            "Job Position"
-                        )
-                        
-                        # Add file access info
-                        score_result['file_url'] = f"/uploads/{unique_filename}"
-                        score_result['original_filename'] = file.filename
-                        
-                        candidates_data.append(score_result)
-                    except Exception as e:
-                        print(f"Error processing {file.filename}: {str(e)}")
-                        # Add error entry
-                        candidates_data.append({
-                            'candidate_name': 'Error Processing',
-                            'total_score': 0,
-                            'breakdown': {'skills_match': 0, 'experience': 0, 'education': 0},
-                            'feedback': f"Error processing file: {str(e)}",
-                            'file_url': f"/uploads/{unique_filename}",
-                            'original_filename': file.filename
-                        })
+                    # Stored under its content hash (original name is kept for display), so
+                    # re-ranking the same resumes or duplicate applicant files keep one copy
+                    unique_filename = _content_upload_name(digest, file.filename)
+                    filepath = os.path.join(UPLOAD_FOLDER, unique_filename)
+                    if not os.path.exists(filepath):
+                        if data is not None:
+                            pending_writes.append(upload_writer.submit(_save_upload_bytes, filepath, data))
+                        elif not _link_spooled_upload(file, filepath):
+                            file.stream.seek(0)
+                            with _atomic_write(filepath) as f:
+                                file.save(f, buffer_size=1024 * 1024)
+                    saved_files.append((filepath, file.filename, unique_filename, data))
+                    upload_keys.append(_upload_cache_key(digest, file.filename))
                     # Note: We do NOT remove the file here anymore so it can be accessed
         
+        results = _rank_uploaded_resumes(saved_files, upload_keys, job_description)
+        
+        if request.form.get('stream') == 'true':
+            # NDJSON: one candidate per line as soon as its batch is scored; the client sorts
+            def generate():
+                # Parsing and scoring run lazily here, after the 200 status is sent, so a
+                # failure is reported as a final {"error": ...} line instead of a cut-off body
+                try:
+                    for result in results:
+                        yield app.json.dumps(result) + '\n'
+                except Exception as e:
+                    logger.error("Error ranking candidates: %s", e)
+                    yield app.json.dumps({'error': str(e)}) + '\n'
+                finally:
+                    # Make sure every file_url sent is servable before the response ends
+                    wait(pending_writes)
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
         # Sort by score
-        candidates_data.sort(key=lambda x: x.get('total_score', 0), reverse=True)
+        candidates_data = sorted(results, key=lambda x: x.get('total_score', 0), reverse=True)
+        wait(pending_writes)
         
         return jsonify({
             'success': True,
@@ -305,13 +587,266 @@ def rank_candidates():
         })
         
     except Exception as e:
-        print(f"Error ranking candidates: {str(e)}")
+        logger.error("Error ranking candidates: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
+def _get_parse_pool():
+    """Lazily create the process pool used for CPU-bound resume parsing"""
+    global _parse_pool
+    # Serverless runtimes lack the shared memory multiprocessing needs
+    if IS_SERVERLESS:
+        return None
+    if _parse_pool is None:
+        with _parse_pool_lock:
+            if _parse_pool is None:
+                try:
+                    _parse_pool = ProcessPoolExecutor(
+                        max_workers=PARSE_POOL_WORKERS,
+                        mp_context=multiprocessing.get_context(PARSE_POOL_START_METHOD)
+                    )
+                except (OSError, NotImplementedError) as e:
+                    logger.warning("Process pool unavailable, parsing serially: %s", e)
+                    _parse_pool = False
+    return _parse_pool or None
+
+
+def _shutdown_parse_pool():
+    """Stop the parse pool's worker processes when this process exits"""
+    if _parse_pool:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(_shutdown_parse_pool)
+
+
+def _spooled_upload_path(file):
+    """
+    Path of an upload that UploadRequest spooled into UPLOAD_FOLDER (flushed so it
+    can be read by name), or None for in-memory or anonymous streams.
+    """
+    spool_path = getattr(file.stream, 'name', None)
+    if not isinstance(spool_path, str):
+        return None
+    file.stream.flush()
+    return spool_path
+
+
+def _link_spooled_upload(file, filepath):
+    """
+    Hard-link an upload that UploadRequest already spooled into UPLOAD_FOLDER.
+    Returns False (caller copies instead) for in-memory or anonymous streams.
+    """
+    spool_path = _spooled_upload_path(file)
+    if spool_path is None:
+        return False
+    try:
+        os.link(spool_path, filepath)
+        return True
+    except OSError as e:
+        logger.warning("Could not link spooled upload, copying instead: %s", e)
+        return False
+
+
+@contextmanager
+def _atomic_write(filepath):
+    """
+    Open a private temp file next to filepath and move it into place only once it
+    is fully written, so /uploads never serves a partial file and a failed write
+    leaves nothing behind. The temp file honours the umask, like open() would.
+    """
+    tmp_path = f"{filepath}.{token_hex(4)}.part"
+    try:
+        with open(tmp_path, 'xb') as f:
+            yield f
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _save_upload_bytes(filepath, data):
+    """Persist an upload that was parsed from memory so it can be served from /uploads"""
+    try:
+        with _atomic_write(filepath) as f:
+            f.write(data)
+    except OSError as e:
+        logger.error("Failed to save upload %s: %s", filepath, e)
+
+
+def _upload_cache_key(digest, filename):
+    """
+    Identify an /api/rank upload for the parse and rank caches: content hash + filename
+    (the filename matters because the parser falls back to it for the candidate name)
+    """
+    return f"{digest}:{filename}"
+
+
+def _rank_uploaded_resumes(saved_files, upload_keys, job_description):
+    """
+    Yield /api/rank results, served from cache when this job description was already
+    ranked against the same resumes; otherwise parse, score and cache them.
+    """
+    rank_key = hashlib.blake2b(
+        '\0'.join([job_description, *sorted(upload_keys)]).encode('utf-8'), digest_size=16
+    ).hexdigest()
+    
+    cached = cache_service.get_rank_results(rank_key)
+    if cached is not None and all(key in cached for key in upload_keys):
+        logger.debug("Rank results cache hit: %s", rank_key)
+        for (_, filename, unique_filename, _), key in zip(saved_files, upload_keys):
+            # Point at this request's copy of the file
+            yield {**cached[key], 'file_url': f"/uploads/{unique_filename}", 'original_filename': filename}
+        return
+    
+    parsed = _parse_resumes(saved_files, upload_keys)
+    results_by_key = {}
+    for i, result in _iter_ranked_resumes(saved_files, parsed, job_description):
+        results_by_key[upload_keys[i]] = result
+        yield result
+    # Like parse errors in _parse_resumes, failed entries and keyword-only fallback
+    # scores (AI busy or erroring) are not cached, so re-ranking retries them
+    if all(result.get('ai_scored') for result in results_by_key.values()):
+        cache_service.set_rank_results(rank_key, results_by_key)
+
+
+def _parse_resumes(saved_files, cache_keys):
+    """
+    Parse uploaded resumes, in worker processes when there is more than one.
+    Each entry is (filepath, filename, unique_filename, data); data holds the
+    file bytes for uploads parsed from memory, else None.
+    Returns one result per file: the parsed info dict, or the exception raised.
+    Successful parses are cached under cache_keys (see _upload_cache_key), so
+    re-ranking the same resumes against another job skips parsing.
+    """
+    results = [cache_service.get_parsed_resume(key) for key in cache_keys]
+    misses = [i for i, info in enumerate(results) if info is None]
+    if len(misses) < len(saved_files):
+        logger.debug("Resume parse cache hits: %s/%s", len(saved_files) - len(misses), len(saved_files))
+    
+    pool = _get_parse_pool() if len(misses) > 1 else None
+    if pool is None:
+        for i in misses:
+            filepath, filename, _, data = saved_files[i]
+            try:
+                results[i] = parse_resume_file(filepath, filename, data)
+            except Exception as e:
+                results[i] = e
+    else:
+        futures = [
+            (i, pool.submit(parse_resume_file, saved_files[i][0], saved_files[i][1], saved_files[i][3]))
+            for i in misses
+        ]
+        for i, future in futures:
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                results[i] = e
+    
+    for i in misses:
+        info = results[i]
+        if isinstance(info, dict) and 'error' not in info:
+            cache_service.set_parsed_resume(cache_keys[i], dict(info))
+    return results
+
+
+def _iter_ranked_resumes(saved_files, parsed, job_description):
+    """
+    Yield (index, result entry) for each uploaded resume for /api/rank.
+    Resumes that failed to parse come first; the rest are scored in batches of
+    ANALYSIS_BATCH_SIZE (one AI call per batch), up to RANK_SCORING_WORKERS batches
+    concurrently, and yielded as each batch finishes.
+    """
+    parsed_ok = []
+    for i, ((_, filename, unique_filename, _), candidate_info) in enumerate(zip(saved_files, parsed)):
+        if isinstance(candidate_info, dict) and 'error' not in candidate_info:
+            parsed_ok.append(i)
+        else:
+            yield i, _score_uploaded_resume(candidate_info, job_description, filename, unique_filename)
+    
+    batches = [parsed_ok[start:start + ANALYSIS_BATCH_SIZE] for start in range(0, len(parsed_ok), ANALYSIS_BATCH_SIZE)]
+    if not batches:
+        return
+    
+    # Scoring time is almost all AI API latency, so batches overlap well in threads
+    with ThreadPoolExecutor(max_workers=min(RANK_SCORING_WORKERS, len(batches)), thread_name_prefix='rank-score') as pool:
+        futures = {
+            pool.submit(_score_resume_batch, [parsed[i] for i in batch], job_description): batch
+            for batch in batches
+        }
+        for future in as_completed(futures):
+            batch = futures[future]
+            for i, score_result in zip(batch, future.result()):
+                _, filename, unique_filename, _ = saved_files[i]
+                yield i, _score_uploaded_resume(parsed[i], job_description, filename, unique_filename, score_result)
+
+
+def _score_resume_batch(candidate_infos, job_description):
+    """Score one /api/rank batch; on failure return None per candidate so each is scored individually"""
+    try:
+        return candidate_scorer.score_candidates_batch(candidate_infos, job_description, "Job Position")
+    except Exception as e:
+        logger.warning("Batch scoring failed, scoring individually: %s", e)
+        return [None] * len(candidate_infos)
+
+
+def _score_uploaded_resume(candidate_info, job_description, filename, unique_filename, score_result=None):
+    """
+    Score one parsed resume from /api/rank, returning an error entry if it failed.
+    A score_result already computed by batch scoring is reused as-is.
+    """
+    try:
+        if isinstance(candidate_info, Exception):
+            raise candidate_info
+        
+        # If parsing failed or returned error
+        if 'error' in candidate_info:
+            logger.error("Error parsing %s: %s", filename, candidate_info['error'])
+            # Still add to list so admin can see it failed and view file
+            return {
+                'candidate_name': 'Parsing Failed',
+                'total_score': 0,
+                'breakdown': {'skills_match': 0, 'experience': 0, 'education': 0},
+                'feedback': f"Could not parse resume. Error: {candidate_info['error']}",
+                'file_url': f"/uploads/{unique_filename}",
+                'original_filename': filename
+            }
+            
+        # Score candidate
+        if score_result is None:
+            score_result = candidate_scorer.score_candidate(
+                candidate_info, 
+                job_description, 
+                "Job Position"
+            )
+        
+        # Add file access info
+        score_result['file_url'] = f"/uploads/{unique_filename}"
+        score_result['original_filename'] = filename
+        return score_result
+    except Exception as e:
+        logger.error("Error processing %s: %s", filename, e)
+        # Add error entry
+        return {
+            'candidate_name': 'Error Processing',
+            'total_score': 0,
+            'breakdown': {'skills_match': 0, 'experience': 0, 'education': 0},
+            'feedback': f"Error processing file: {str(e)}",
+            'file_url': f"/uploads/{unique_filename}",
+            'original_filename': filename
+        }
+
+
 @app.route('/api/process', methods=['POST'])
 def process_job_description():
     """Process job description and generate interview questions"""
+    # Reject oversized bodies before the multipart body is parsed
+    if _content_too_large():
+        return jsonify({'error': 'File too large'}), 413
+    
     try:
         job_description = ""
         job_title = request.form.get('job_title', 'Job Position')
@@ -324,15 +859,24 @@ def process_job_description():
         if 'file' in request.files:
             file = request.files['file']
             if file and file.filename and allowed_file(file.filename):
-                # Save file temporarily
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], file.filename)
-                file.save(filepath)
-                
-                # Extract text from file
-                job_description = extract_text_from_file(filepath)
-                
-                # Clean up
-                os.remove(filepath)
+                data = file.stream.read(IN_MEMORY_PARSE_LIMIT + 1)
+                if len(data) <= IN_MEMORY_PARSE_LIMIT:
+                    # Small files: extract from memory (cached by content hash)
+                    job_description = _extract_bytes_cached(data, file.filename)
+                else:
+                    # Save to a unique temp file, aborting once it exceeds the size cap
+                    file.stream.seek(0)
+                    filepath = _new_temp_upload(file.filename)
+                    try:
+                        digest = _stream_to_file(file.stream, filepath, max_bytes=app.config['MAX_CONTENT_LENGTH'])
+                        
+                        # Extract text from file (cached by content hash)
+                        job_description = _extract_text_cached(filepath, digest)
+                    except RequestEntityTooLarge:
+                        return jsonify({'error': 'File too large'}), 413
+                    finally:
+                        # Clean up
+                        os.remove(filepath)
         
         # Check if text was provided directly
         if not job_description and 'job_description' in request.form:
@@ -341,29 +885,276 @@ def process_job_description():
         if not job_description:
             return jsonify({'error': 'No job description provided'}), 400
         
-        # Generate questions using AI
-        questions = generate_interview_questions(
-            job_description, 
-            job_title,
-            num_questions,
-            question_types,
-            ai_provider,
-            api_key
-        )
+        return _questions_response(job_description, job_title, num_questions, question_types, ai_provider, api_key)
         
-        if not questions:
-            return jsonify({'error': 'Failed to generate questions'}), 500
+    except Exception as e:
+        logger.error("Error processing request: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/process-stream', methods=['POST'])
+def process_job_description_stream():
+    """
+    Process a job description file sent as the raw request body.
+    Metadata is passed via headers (X-Filename, X-Job-Title, X-Num-Questions,
+    X-Question-Types, X-AI-Provider, X-API-Key) so the body can be streamed
+    straight to disk without a multipart parse.
+    """
+    if _content_too_large():
+        return jsonify({'error': 'File too large'}), 413
+    
+    filepath = None
+    try:
+        filename = request.headers.get('X-Filename', '')
+        job_title = request.headers.get('X-Job-Title', 'Job Position')
+        num_questions = int(request.headers.get('X-Num-Questions', 10))
+        question_types = request.headers.get('X-Question-Types', 'mixed')
+        ai_provider = request.headers.get('X-AI-Provider', 'perplexity')
+        api_key = request.headers.get('X-API-Key', '')
+        
+        if not filename or not allowed_file(filename):
+            return jsonify({'error': 'Invalid file type. Please upload PDF, DOCX, or TXT'}), 400
         
-        return jsonify({
-            'success': True,
-            'questions': questions,
-            'job_title': job_title,
-            'job_description': job_description
-        })
+        filepath = os.path.join(UPLOAD_FOLDER, _unique_upload_name(filename))
+        digest = _stream_to_file(request.stream, filepath, max_bytes=app.config['MAX_CONTENT_LENGTH'])
+        
+        job_description = _extract_text_cached(filepath, digest)
+        if not job_description:
+            return jsonify({'error': 'No job description provided'}), 400
         
+        return _questions_response(job_description, job_title, num_questions, question_types, ai_provider, api_key)
+        
+    except RequestEntityTooLarge:
+        return jsonify({'error': 'File too large'}), 413
     except Exception as e:
-        print(f"Error processing request: {str(e)}")
+        logger.error("Error processing streamed request: %s", e)
         return jsonify({'error': str(e)}), 500
+    finally:
+        if filepath:
+            try:
+                os.remove(filepath)
+            except OSError:
+                pass
+
+
+def _new_temp_upload(filename):
+    """Create a unique, empty file in the upload folder keeping only the (sanitized) extension"""
+    with tempfile.NamedTemporaryFile(dir=UPLOAD_FOLDER, suffix=_safe_extension(filename), delete=False) as tmp:
+        return tmp.name
+
+
+def _content_digest(data):
+    """BLAKE2b content hash of in-memory bytes (same digest as file_fingerprint)"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _stream_digest(stream, chunk_size=1 << 20):
+    """Content hash of a seekable upload stream, rewound afterwards"""
+    h = hashlib.blake2b(digest_size=16)
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        h.update(chunk)
+    stream.seek(0)
+    return h.hexdigest()
+
+
+def _content_upload_name(digest, filename):
+    """
+    Content-addressed name for a stored resume: identical files share one copy.
+    Files are never modified or deleted once stored, so sharing is safe.
+    """
+    return f"{digest}{_safe_extension(filename)}"
+
+
+def _unique_upload_name(filename):
+    """Random name for storing an upload, keeping only its extension (the parser relies on it)"""
+    return f"{token_hex(16)}{_safe_extension(filename)}"
+
+
+def _safe_extension(filename):
+    """Lowercased extension of a client-supplied filename, or '' if it isn't plain alphanumeric"""
+    ext = os.path.splitext(filename)[1].lower()
+    return ext if ext[1:].isalnum() and ext[1:].isascii() else ''
+
+
+def _content_too_large():
+    """Check the declared Content-Length against the upload limit"""
+    content_length = request.content_length
+    return bool(content_length and content_length > app.config['MAX_CONTENT_LENGTH'])
+
+
+def _is_html_download(content_type, head):
+    """
+    Detect an HTML page (e.g. a Drive sign-in or warning page) served instead of a file.
+    Trusts an explicit text/html Content-Type; otherwise sniffs the first bytes.
+    """
+    if 'text/html' in content_type.lower():
+        return True
+    # Skip whitespace and a UTF-8 BOM; any doctype (e.g. HTML 4 "<!DOCTYPE HTML PUBLIC") counts
+    return head[:HTML_SNIFF_BYTES].lstrip(b' \t\r\n\xef\xbb\xbf').lower().startswith((b'<!doctype', b'<html'))
+
+
+def _content_disposition_filename(content_disposition):
+    """
+    Filename from a Content-Disposition header, quoted or bare (ends at ';'), or None.
+    Plain string partitioning; only the first filename= parameter is used.
+    """
+    _, found, rest = content_disposition.partition('filename=')
+    if not found:
+        return None
+    if rest.startswith('"'):
+        fname = rest[1:].partition('"')[0]
+    else:
+        fname = rest.partition(';')[0]
+    return fname.strip() or None
+
+
+def _read_small_body(head, chunks, limit):
+    """
+    Read a streamed body into memory if it fits within limit bytes.
+    Returns (data, None) when it fits, else (None, consumed) with the chunks read
+    so far, to be written out ahead of the rest of the stream.
+    """
+    consumed = [head]
+    total = len(head)
+    for chunk in chunks:
+        consumed.append(chunk)
+        total += len(chunk)
+        if total > limit:
+            return None, consumed
+    return b''.join(consumed), None
+
+
+def _write_chunks(filepath, chunks, max_bytes=None, hasher=None):
+    """
+    Write an iterable of byte chunks to disk (atomically, see _atomic_write),
+    returning the number of bytes written. Raises RequestEntityTooLarge as soon as
+    more than max_bytes have been received, leaving filepath untouched.
+    """
+    total = 0
+    with _atomic_write(filepath) as f:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            total += len(chunk)
+            if max_bytes and total > max_bytes:
+                raise RequestEntityTooLarge()
+            if hasher:
+                hasher.update(chunk)
+            f.write(chunk)
+    return total
+
+
+def _stream_to_file(stream, filepath, chunk_size=65536, max_bytes=None):
+    """Copy a request stream to disk in fixed-size chunks, returning its content hash"""
+    h = hashlib.blake2b(digest_size=16)
+    _write_chunks(filepath, iter(lambda: stream.read(chunk_size), b''), max_bytes=max_bytes, hasher=h)
+    return h.hexdigest()
+
+
+def _extract_text_cached(filepath, digest=None):
+    """Extract text from a file, reusing the cached result for identical content"""
+    digest = digest or file_fingerprint(filepath)
+    return _cached_extraction(digest, lambda: extract_text_from_file(filepath))
+
+
+def _extract_bytes_cached(data, filename):
+    """Extract text from an in-memory upload, sharing the cache used for files on disk"""
+    digest = _content_digest(data)
+    return _cached_extraction(digest, lambda: extract_text_from_bytes(data, filename))
+
+
+def _cached_extraction(digest, extract):
+    """Return cached text for a content hash, or run extract() and cache a non-empty result"""
+    text = cache_service.get_extracted_text(digest)
+    if text is not None:
+        logger.debug("Text extraction cache hit: %s", digest)
+        return text
+    
+    text = extract()
+    if text:
+        cache_service.set_extracted_text(digest, text)
+    return text
+
+
+@app.route('/api/process/status/<task_id>', methods=['GET'])
+def question_task_status(task_id):
+    """Poll the state of a background question-generation task"""
+    task = cache_service.get_question_task(task_id)
+    if task is None:
+        return jsonify({'error': 'Task not found'}), 404
+    return jsonify({'task_id': task_id, **task})
+
+
+def _async_requested():
+    """Whether the client asked for background question generation"""
+    return (request.form.get('async', '').lower() in ('1', 'true')
+            or request.headers.get('Prefer', '').lower() == 'respond-async')
+
+
+def _run_question_task(task_id, job_description, job_title, num_questions, question_types, ai_provider, api_key):
+    """Generate questions in a worker thread and publish the result to the cache"""
+    try:
+        questions = generate_interview_questions(
+            job_description, job_title, num_questions, question_types, ai_provider, api_key
+        )
+        if questions:
+            task = {'state': 'success', 'questions': questions, 'job_title': job_title, 'job_description': job_description}
+        else:
+            task = {'state': 'failed', 'error': 'Failed to generate questions'}
+    except Exception as e:
+        logger.error("Error in question task %s: %s", task_id, e)
+        task = {'state': 'failed', 'error': str(e)}
+    cache_service.set_question_task(task_id, task)
+
+
+def _questions_response(job_description, job_title, num_questions, question_types, ai_provider, api_key):
+    """Generate interview questions and build the JSON response"""
+    # Background mode: return a task ID immediately instead of holding the worker
+    # for the LLM round-trip. Serverless platforms kill background threads, and
+    # the in-memory cache is per worker process (status polls would land on a
+    # worker that never saw the task), so generate inline unless Redis is shared.
+    if _async_requested() and not IS_SERVERLESS and cache_service.is_redis:
+        task_id = token_hex(16)
+        cache_service.set_question_task(task_id, {'state': 'pending'})
+        background_executor.submit(
+            _run_question_task,
+            task_id, job_description, job_title, num_questions, question_types, ai_provider, api_key
+        )
+        return jsonify({'success': True, 'task_id': task_id, 'status_url': f'/api/process/status/{task_id}'}), 202
+    
+    questions = generate_interview_questions(
+        job_description, 
+        job_title,
+        num_questions,
+        question_types,
+        ai_provider,
+        api_key
+    )
+    
+    if not questions:
+        return jsonify({'error': 'Failed to generate questions'}), 500
+    
+    return jsonify({
+        'success': True,
+        'questions': questions,
+        'job_title': job_title,
+        'job_description': job_description
+    })
+
+
+def _build_zapier_base(job_title, questions):
+    """
+    Fields shared by both Zapier payload formats. question_N is sent only for
+    questions that exist (up to 10); Zapier treats an absent field as blank.
+    """
+    base = {
+        'job_title': job_title,
+        'timestamp': now_iso(),
+        'total_questions': len(questions),
+    }
+    base.update((f'question_{i}', q.get('question', '')) for i, q in enumerate(questions[:10], 1))
+    return base
 
 
 @app.route('/api/send-to-zapier', methods=['POST'])
@@ -376,6 +1167,9 @@ def send_to_zapier():
         webhook_url = data.get('webhook_url', '')
         form_type = data.get('form_type', 'sheets')  # 'sheets' or 'application_form'
         company_name = data.get('company_name', '')
+        # questions_text is documented for Sheets mapping, so it stays on unless a
+        # client that only maps question_N / the structured list opts out
+        include_text = data.get('include_text', True) is not False
         
         if not questions:
             return jsonify({'error': 'No questions provided'}), 400
@@ -390,154 +1184,120 @@ def send_to_zapier():
                 'action': 'create_application_form',
                 'form_title': f"Job Application - {job_title}",
                 'company_name': company_name,
-                'job_title': job_title,
-                'timestamp': datetime.now().isoformat(),
-                'total_questions': len(questions),
+                # job_title, timestamp, total_questions and question_1..question_10
+                **_build_zapier_base(job_title, questions),
                 # Standard application fields
-                'standard_fields': [
-                    {'field': 'Full Name', 'type': 'text', 'required': True},
-                    # Email is collected automatically by Google Forms via setCollectEmail(true)
-                    {'field': 'Phone Number', 'type': 'phone', 'required': True},
-                    {'field': 'Resume/CV Upload', 'type': 'file', 'required': True},
-                    {'field': 'LinkedIn Profile', 'type': 'url', 'required': False},
-                    {'field': 'Years of Experience', 'type': 'number', 'required': True},
-                    {'field': 'Current/Previous Company', 'type': 'text', 'required': False},
-                    {'field': 'Expected Salary', 'type': 'text', 'required': False},
-                    {'field': 'Availability to Start', 'type': 'date', 'required': True},
-                ],
+                'standard_fields': STANDARD_APPLICATION_FIELDS,
                 # Interview questions
-                'interview_questions': [],
-                # Formatted questions as single text for easy use
-                'questions_text': '',
-                # Individual question fields for Google Forms
-                'question_1': '',
-                'question_2': '',
-                'question_3': '',
-                'question_4': '',
-                'question_5': '',
-                'question_6': '',
-                'question_7': '',
-                'question_8': '',
-                'question_9': '',
-                'question_10': '',
+                'interview_questions': [
+                    {
+                        'number': i,
+                        'question': q.get('question', ''),
+                        'category': q.get('category', 'general'),
+                        'difficulty': q.get('difficulty', 'medium'),
+                        'field_type': 'paragraph'  # Long answer for interview questions
+                    }
+                    for i, q in enumerate(questions, 1)
+                ],
             }
             
-            questions_text_parts = []
-            for i, q in enumerate(questions, 1):
-                q_text = q.get('question', '')
-                category = q.get('category', 'general')
-                
-                zapier_data['interview_questions'].append({
-                    'number': i,
-                    'question': q_text,
-                    'category': category,
-                    'difficulty': q.get('difficulty', 'medium'),
-                    'field_type': 'paragraph'  # Long answer for interview questions
-                })
-                
-                questions_text_parts.append(f"Q{i}. [{category.upper()}] {q_text}")
-                
-                # Set individual question fields (up to 10)
-                if i <= 10:
-                    zapier_data[f'question_{i}'] = q_text
-            
-            zapier_data['questions_text'] = '\n\n'.join(questions_text_parts)
+            # Formatted questions as single text for easy use
+            if include_text:
+                zapier_data['questions_text'] = '\n\n'.join(
+                    f"Q{iq['number']}. [{iq['category'].upper()}] {iq['question']}"
+                    for iq in zapier_data['interview_questions']
+                )
             
         else:
             # Standard sheets format
             zapier_data = {
                 'action': 'save_to_sheets',
-                'job_title': job_title,
-                'timestamp': datetime.now().isoformat(),
-                'total_questions': len(questions),
-                'questions': [],
-                'questions_text': '',
-                # Individual fields for easier Zapier mapping
-                'question_1': '',
-                'question_2': '',
-                'question_3': '',
-                'question_4': '',
-                'question_5': '',
-                'question_6': '',
-                'question_7': '',
-                'question_8': '',
-                'question_9': '',
-                'question_10': '',
+                # job_title, timestamp, total_questions and question_1..question_10
+                **_build_zapier_base(job_title, questions),
+                'questions': [
+                    {
+                        'number': i,
+                        'question': q.get('question', ''),
+                        'category': q.get('category', 'general'),
+                        'difficulty': q.get('difficulty', 'medium'),
+                        'expected_skills': ', '.join(q.get('expected_skills', []))
+                    }
+                    for i, q in enumerate(questions, 1)
+                ],
             }
-            
-            questions_text_parts = []
-            for i, q in enumerate(questions, 1):
-                q_text = q.get('question', '')
-                zapier_data['questions'].append({
-                    'number': i,
-                    'question': q_text,
-                    'category': q.get('category', 'general'),
-                    'difficulty': q.get('difficulty', 'medium'),
-                    'expected_skills': ', '.join(q.get('expected_skills', []))
-                })
-                questions_text_parts.append(f"{i}. {q_text}")
-                if i <= 10:
-                    zapier_data[f'question_{i}'] = q_text
-            
-            zapier_data['questions_text'] = '\n'.join(questions_text_parts)
+            if include_text:
+                zapier_data['questions_text'] = '\n'.join(f"{q['number']}. {q['question']}" for q in zapier_data['questions'])
+        
+        # Fire-and-forget for the sheets format, which needs nothing back from the webhook.
+        # Serverless platforms kill background threads, so always send inline there.
+        if data.get('async') and form_type != 'application_form' and not IS_SERVERLESS:
+            background_executor.submit(_post_to_zapier_background, webhook_url, zapier_data)
+            return jsonify({
+                'success': True,
+                'queued': True,
+                'message': 'Data queued for sending. Check your Google Sheet shortly.'
+            }), 202
         
         # Send to Zapier webhook
-        response = requests.post(webhook_url, json=zapier_data, timeout=30)
+        response = zapier_session.post(
+            webhook_url,
+            data=json_dumps_bytes(zapier_data),
+            headers={'Content-Type': 'application/json'},
+            timeout=30
+        )
         
-        print(f"\nWebhook Response Status: {response.status_code}")
-        print(f"Response Content: {response.text[:500]}")
+        logger.debug("Webhook Response Status: %s", response.status_code)
+        logger.debug("Response Content: %s", response_preview(response))
         
         if response.status_code == 200:
             # Try to parse response for formUrl (from Google Apps Script)
             form_url = None
+            resp_json = None
             try:
-                resp_json = response.json()
-                print(f"Parsed JSON: {resp_json}")
+                resp_json = json_loads(response.content)
+                logger.debug("Parsed JSON: %s", resp_json)
                 if isinstance(resp_json, dict):
                     form_url = resp_json.get('formUrl')
-                    print(f"Extracted formUrl: {form_url}")
+                    logger.debug("Extracted formUrl: %s", form_url)
             except Exception as e:
-                print(f"Error parsing response: {e}")
+                logger.warning("Could not parse webhook response: %s", e)
                 pass
 
             if form_type == 'application_form':
                 # Create Job in Database
-                job_data = None
+                raw_description = data.get('job_description', '')
+                # On a server the AI formatting of the description runs after the
+                # response: the job is saved with the raw text now and updated in place.
+                # Serverless platforms kill background threads, so format inline there.
+                format_later = bool(raw_description) and not IS_SERVERLESS
+                job_data = {
+                    'title': job_title,
+                    'description': raw_description,
+                    'form_url': form_url,
+                    'edit_url': resp_json.get('editUrl') if isinstance(resp_json, dict) else None,
+                    'script_url': webhook_url, # Save the script URL to control the form later
+                    'status': 'active',
+                    'questions': questions,
+                    'company_name': company_name
+                }
+                if not format_later:
+                    # Format description with AI (keeps the raw text if that fails)
+                    try:
+                        job_data['description'] = format_job_description(raw_description)
+                    except Exception as e:
+                        logger.error("Error formatting job description: %s", e)
+                
+                job_created = False
                 try:
-                    # Format description with AI
-                    raw_description = data.get('job_description', '')
-                    formatted_description = format_job_description(raw_description)
-                    
-                    job_data = {
-                        'title': job_title,
-                        'description': formatted_description,
-                        'form_url': form_url,
-                        'edit_url': resp_json.get('editUrl') if resp_json else None,
-                        'script_url': webhook_url, # Save the script URL to control the form later
-                        'status': 'active',
-                        'questions': questions,
-                        'company_name': company_name
-                    }
                     storage_service.create_job(job_data)
-                    print(f"Job created: {job_title}")
+                    cache_service.invalidate_jobs()
+                    job_created = True
+                    logger.info("Job created: %s", job_title)
                 except Exception as e:
-                    print(f"Error creating job record: {e}")
-                    # Fallback if AI fails or other error
-                    if not job_data:
-                         job_data = {
-                            'title': job_title,
-                            'description': data.get('job_description', ''),
-                            'form_url': form_url,
-                            'edit_url': resp_json.get('editUrl') if resp_json else None,
-                            'script_url': webhook_url,
-                            'status': 'active',
-                            'questions': questions,
-                            'company_name': company_name
-                        }
-                         try:
-                             storage_service.create_job(job_data)
-                         except:
-                             pass
+                    logger.error("Error creating job record: %s", e)
+
+                if format_later and job_created:
+                    background_executor.submit(_format_job_description_background, job_data['id'], raw_description)
 
                 message = 'Job application form created successfully!'
                 if form_url:
@@ -549,7 +1309,7 @@ def send_to_zapier():
                     'success': True,
                     'message': message,
                     'formUrl': form_url,
-                    'jobId': job_data.get('id') if job_data else None
+                    'jobId': job_data['id'] if job_created else None
                 })
             else:
                 return jsonify({
@@ -564,10 +1324,36 @@ def send_to_zapier():
     except requests.exceptions.Timeout:
         return jsonify({'error': 'Zapier webhook timed out'}), 500
     except Exception as e:
-        print(f"Error sending to Zapier: {str(e)}")
+        logger.error("Error sending to Zapier: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
+def _format_job_description_background(job_id, raw_description):
+    """AI-format a new job's description after send_to_zapier has responded, then store it"""
+    try:
+        formatted = format_job_description(raw_description)
+        if formatted and formatted != raw_description and storage_service.update_job_description(job_id, formatted):
+            cache_service.invalidate_jobs()
+            cache_service.delete(f'job:{job_id}')
+            logger.info("Formatted description saved for job %s", job_id)
+    except Exception as e:
+        logger.error("Error formatting job description in background: %s", e)
+
+
+def _post_to_zapier_background(webhook_url, zapier_data):
+    """POST a payload to a Zapier/Apps Script webhook from the background executor"""
+    try:
+        response = zapier_session.post(
+            webhook_url,
+            data=json_dumps_bytes(zapier_data),
+            headers={'Content-Type': 'application/json'},
+            timeout=30
+        )
+        logger.debug("Background webhook response status: %s", response.status_code)
+    except Exception as e:
+        logger.error("Error sending to Zapier in background: %s", e)
+
+
 @app.route('/api/export/csv', methods=['POST'])
 def export_csv():
     """Export questions as CSV file"""
@@ -579,18 +1365,26 @@ def export_csv():
         if not questions:
             return jsonify({'error': 'No questions provided'}), 400
         
-        # Create CSV content
-        csv_content = 'Number,Question,Category,Difficulty,Expected Skills\n'
-        for i, q in enumerate(questions, 1):
-            question = q.get('question', '').replace('"', '""')
-            category = q.get('category', 'general')
-            difficulty = q.get('difficulty', 'medium')
-            skills = '; '.join(q.get('expected_skills', []))
-            csv_content += f'{i},"{question}",{category},{difficulty},"{skills}"\n'
+        # Stream CSV rows as they are written; the C writer quotes/escapes commas,
+        # quotes and newlines in a single pass
+        rows = (
+            (
+                i,
+                q.get('question', ''),
+                q.get('category', 'general'),
+                q.get('difficulty', 'medium'),
+                '; '.join(q.get('expected_skills') or ())
+            )
+            for i, q in enumerate(questions, 1)
+        )
+        chunks = _csv_stream(
+            ('Number', 'Question', 'Category', 'Difficulty', 'Expected Skills'),
+            rows, quoting=csv.QUOTE_MINIMAL, lineterminator='\n'
+        )
         
         # Return as downloadable file
         return Response(
-            csv_content,
+            stream_with_context(chunks),
             mimetype='text/csv',
             headers={'Content-Disposition': f'attachment; filename=interview-questions-{job_title.replace(" ", "-")}.csv'}
         )
@@ -599,6 +1393,11 @@ def export_csv():
         return jsonify({'error': str(e)}), 500
 
 
+# Rule lines for the TXT export, built once instead of per question
+TXT_HEADER_RULE = "=" * 60 + "\n\n"
+TXT_QUESTION_RULE = "-" * 40 + "\n\n"
+
+
 @app.route('/api/export/txt', methods=['POST'])
 def export_txt():
     """Export questions as formatted text file"""
@@ -610,24 +1409,31 @@ def export_txt():
         if not questions:
             return jsonify({'error': 'No questions provided'}), 400
         
-        # Create formatted text content
-        txt_content = f"INTERVIEW QUESTIONS\n"
-        txt_content += f"Position: {job_title}\n"
-        txt_content += f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n"
-        txt_content += "=" * 60 + "\n\n"
-        
-        for i, q in enumerate(questions, 1):
-            txt_content += f"Question {i}:\n"
-            txt_content += f"{q.get('question', '')}\n\n"
-            txt_content += f"Category: {q.get('category', 'general')}\n"
-            txt_content += f"Difficulty: {q.get('difficulty', 'medium')}\n"
-            skills = q.get('expected_skills', [])
-            if skills:
-                txt_content += f"Expected Skills: {', '.join(skills)}\n"
-            txt_content += "-" * 40 + "\n\n"
+        generated_at = datetime.now().strftime('%Y-%m-%d %H:%M')
+        
+        # Stream formatted text one question block at a time
+        def generate():
+            yield (
+                "INTERVIEW QUESTIONS\n"
+                f"Position: {job_title}\n"
+                f"Generated: {generated_at}\n"
+                + TXT_HEADER_RULE
+            )
+            for i, q in enumerate(questions, 1):
+                parts = [
+                    f"Question {i}:\n",
+                    f"{q.get('question', '')}\n\n",
+                    f"Category: {q.get('category', 'general')}\n",
+                    f"Difficulty: {q.get('difficulty', 'medium')}\n"
+                ]
+                skills = q.get('expected_skills', [])
+                if skills:
+                    parts.append(f"Expected Skills: {', '.join(skills)}\n")
+                parts.append(TXT_QUESTION_RULE)
+                yield ''.join(parts)
         
         return Response(
-            txt_content,
+            stream_with_context(generate()),
             mimetype='text/plain',
             headers={'Content-Disposition': f'attachment; filename=interview-questions-{job_title.replace(" ", "-")}.txt'}
         )
@@ -650,19 +1456,30 @@ def upload_resume():
         if not allowed_file(file.filename):
             return jsonify({'error': 'Invalid file type. Please upload PDF, DOCX, or TXT'}), 400
         
-        # Save file
+        # Original name is only used for name extraction, never as a path
         filename = file.filename
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
         
-        # Parse resume
-        candidate_info = resume_parser.parse_resume(file_path, filename)
-        
-        # Clean up file
-        try:
-            os.remove(file_path)
-        except:
-            pass
+        # Small resumes are parsed straight from memory; nothing is kept afterwards
+        data = file.stream.read(IN_MEMORY_PARSE_LIMIT + 1)
+        if len(data) <= IN_MEMORY_PARSE_LIMIT:
+            candidate_info = resume_parser.parse_resume(None, filename, data=data)
+        elif _spooled_upload_path(file):
+            # Already on disk with the right extension; removed when the request closes
+            candidate_info = resume_parser.parse_resume(file.stream.name, filename)
+        else:
+            file_path = _new_temp_upload(filename)
+            try:
+                file.stream.seek(0)
+                file.save(file_path)
+                
+                # Parse resume
+                candidate_info = resume_parser.parse_resume(file_path, filename)
+            finally:
+                # Clean up file
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    pass
         
         if 'error' in candidate_info:
             return jsonify({'error': candidate_info['error']}), 400
@@ -673,7 +1490,7 @@ def upload_resume():
         })
         
     except Exception as e:
-        print(f"Error uploading resume: {str(e)}")
+        logger.error("Error uploading resume: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -691,9 +1508,7 @@ def score_candidate():
             
         # Perform AI analysis
         # We use the raw text from the resume if available, otherwise construct a summary
-        resume_text = candidate_info.get('raw_text', '')
-        if not resume_text:
-            resume_text = json.dumps(candidate_info)
+        resume_text = candidate_resume_text(candidate_info)
             
         ai_analysis = analyze_candidate_with_ai(resume_text, job_description)
         
@@ -717,7 +1532,7 @@ def score_candidate():
         })
         
     except Exception as e:
-        print(f"Error scoring candidate: {str(e)}")
+        logger.error("Error scoring candidate: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -731,8 +1546,18 @@ def rank_candidates_json():
         if not scored_candidates:
             return jsonify({'error': 'No candidates provided'}), 400
         
+        # Optional top-k so large pools don't return (or fully sort) every candidate
+        limit = data.get('limit')
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except (TypeError, ValueError):
+                limit = 0
+            if limit < 1:
+                return jsonify({'error': 'limit must be a positive integer'}), 400
+        
         # Rank candidates
-        ranked = candidate_scorer.rank_candidates(scored_candidates)
+        ranked = candidate_scorer.rank_candidates(scored_candidates, limit=limit)
         
         return jsonify({
             'success': True,
@@ -740,7 +1565,7 @@ def rank_candidates_json():
         })
         
     except Exception as e:
-        print(f"Error ranking candidates: {str(e)}")
+        logger.error("Error ranking candidates: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -750,126 +1575,203 @@ def webhook_application():
     Webhook to receive job applications from Google Forms/Zapier.
     """
     try:
-        print("\n" + "!"*50)
-        print("WEBHOOK RECEIVED!")
-        print("!"*50 + "\n")
+        logger.info("Webhook received")
         data = request.get_json()
-        print(f"Received webhook data: {data.keys()}")
+        logger.debug("Received webhook data: %s", data.keys())
         
         # Try to link to a Job FIRST (needed for duplicate check)
         job_id = None
         job_desc_from_form = data.get('job_description', '') or ''
         
-        # Search active jobs to find a match
+        # Search active jobs to find a match. The cached job list (shared with
+        # /api/jobs) serves most webhooks; a title miss re-reads the database in
+        # case the job was created after the list was cached.
+        # Only ACTIVE jobs are matched; the list is filtered once and shared by
+        # every strategy below.
+        active_jobs = []
         try:
-            active_jobs = storage_service.get_all_jobs()
-            print(f"Job matching: Found {len(active_jobs)} jobs, form description: '{job_desc_from_form[:50]}...'")
+            cached_jobs = cache_service.get_jobs()
+            all_jobs = cached_jobs if cached_jobs is not None else _load_jobs()
+            active_jobs = _active_jobs(all_jobs)
+            logger.debug("Job matching: Found %s jobs, form description: '%s...'", len(all_jobs), job_desc_from_form[:50])
             
             # Strategy 1: Match by job title in form description
-            for job in active_jobs:
-                # Only match ACTIVE jobs
-                if job.get('status') != 'active':
-                    continue
-                    
-                # Check if job title is in the form description (e.g. "Job Application for Software Engineer")
-                if job.get('title') and job.get('title') in job_desc_from_form:
-                    job_id = job['id']
-                    print(f"✓ Matched by title: {job_id} ({job['title']})")
-                    
-                    # Use the FULL JD from the database for better scoring
-                    if job.get('description'):
-                        print("Using full JD from database for scoring.")
-                        data['job_description'] = job['description']
-                    break
+            # (e.g. "Job Application for Software Engineer")
+            job = _match_job_by_title(active_jobs, job_desc_from_form)
+            if job is None and cached_jobs is not None:
+                active_jobs = _active_jobs(_load_jobs())
+                job = _match_job_by_title(active_jobs, job_desc_from_form)
+            if job:
+                job_id = job['id']
+                logger.info("✓ Matched by title: %s (%s)", job_id, job['title'])
+                
+                # Use the FULL JD from the database for better scoring
+                if job.get('description'):
+                    logger.debug("Using full JD from database for scoring.")
+                    data['job_description'] = job['description']
             
             # Strategy 2: If only one active job and no match found, assign to it
             if not job_id:
-                active_only = [j for j in active_jobs if j.get('status') == 'active']
-                if len(active_only) == 1:
-                    job = active_only[0]
+                if len(active_jobs) == 1:
+                    job = active_jobs[0]
                     job_id = job['id']
-                    print(f"✓ Auto-assigned to only active job: {job_id} ({job['title']})")
+                    logger.info("✓ Auto-assigned to only active job: %s (%s)", job_id, job['title'])
                     if job.get('description'):
                         data['job_description'] = job['description']
-                elif len(active_only) == 0:
-                    print("⚠️ No active jobs found!")
+                elif len(active_jobs) == 0:
+                    logger.warning("⚠️ No active jobs found!")
                 else:
-                    print(f"⚠️ Multiple active jobs ({len(active_only)}), couldn't auto-match")
+                    logger.warning("⚠️ Multiple active jobs (%s), couldn't auto-match", len(active_jobs))
                     
         except Exception as e:
-            print(f"Error matching job: {e}")
+            logger.error("Error matching job: %s", e)
 
         if job_id:
             data['job_id'] = job_id
         else:
             # CRITICAL: Prevent orphan candidates by assigning to most recent active job
-            print("⚠️ WARNING: No job_id found - attempting to assign to most recent active job...")
-            all_jobs = storage_service.get_all_jobs()
-            active_jobs = [j for j in all_jobs if j.get('status') == 'active']
+            logger.warning("⚠️ No job_id found - attempting to assign to most recent active job...")
             if active_jobs:
-                # Sort by created_at descending and take the most recent
-                active_jobs.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-                job_id = active_jobs[0]['id']
+                # Take the most recently created
+                latest = max(active_jobs, key=lambda x: x.get('created_at', ''))
+                job_id = latest['id']
                 data['job_id'] = job_id
-                if active_jobs[0].get('description'):
-                    data['job_description'] = active_jobs[0]['description']
-                print(f"✓ Auto-assigned to most recent active job: {job_id} ({active_jobs[0].get('title', 'Unknown')})")
+                if latest.get('description'):
+                    data['job_description'] = latest['description']
+                logger.info("✓ Auto-assigned to most recent active job: %s (%s)", job_id, latest.get('title', 'Unknown'))
             else:
-                print("❌ CRITICAL: No active jobs available! Application will be orphaned.")
+                logger.error("❌ CRITICAL: No active jobs available! Application will be orphaned.")
         
         # Check for duplicates - comprehensive check by email AND phone
         email = data.get('email')
         phone = data.get('phone')
         
-        # First: Quick debounce check (same email in last 2 minutes)
-        if email:
-            recent = storage_service.get_recent_candidate_by_email(email, job_id=job_id, minutes=2)
-            if recent:
-                print(f"⚠️ DUPLICATE (DEBOUNCE): Ignoring webhook for {email} on job {job_id} (processed in last 2 min)")
-                return jsonify({
-                    "status": "duplicate",
-                    "message": "Duplicate application ignored (recently submitted).",
-                    "existing_id": recent.get('id')
-                }), 200
-        
-        # Second: Full duplicate check (same email OR phone ever applied to this job)
-        existing_application = storage_service.check_duplicate_application(
-            email=email, 
-            phone=phone, 
-            job_id=job_id
-        )
-        if existing_application:
-            print(f"⚠️ DUPLICATE (EXISTING): {email or phone} already applied to job {job_id}")
+        # Atomic claim first: Zapier/Forms retries of the same submission are turned
+        # away with one cache lookup instead of database round-trips, and concurrent
+        # retries that would all pass the checks below before any has saved cannot
+        # race each other
+        claim_key = _application_claim_key(job_id, email, phone, data.get('resume_url'))
+        if claim_key and not cache_service.claim_application(claim_key):
+            existing_id = cache_service.get_application_claim(claim_key)
+            in_flight = existing_id in (None, 'pending')
+            logger.warning("⚠️ DUPLICATE (CLAIMED): %s on job %s was already received", email or phone, job_id)
             return jsonify({
                 "status": "duplicate",
-                "message": "You have already applied for this position.",
-                "existing_id": existing_application.get('id'),
-                "applied_at": existing_application.get('timestamp')
+                "message": "Duplicate application ignored (already being processed)." if in_flight
+                           else "Duplicate application ignored (recently submitted).",
+                "existing_id": None if in_flight else existing_id
             }), 200
 
-        # 1. Save Pending Application IMMEDIATELY (Critical for Vercel)
-        candidate_id = save_pending_application(data)
+        # Until the application is saved the claim is released on any failure, otherwise
+        # every retry within the claim TTL would be turned away and the application lost
+        try:
+            # Then: Quick debounce check (same email in last 2 minutes)
+            if email:
+                recent = storage_service.get_recent_candidate_by_email(email, job_id=job_id, minutes=2)
+                if recent:
+                    logger.warning("⚠️ DUPLICATE (DEBOUNCE): Ignoring webhook for %s on job %s (processed in last 2 min)", email, job_id)
+                    if claim_key:
+                        cache_service.set_application_claim(claim_key, recent.get('id'))
+                    return jsonify({
+                        "status": "duplicate",
+                        "message": "Duplicate application ignored (recently submitted).",
+                        "existing_id": recent.get('id')
+                    }), 200
+        
+            # Finally: Full duplicate check (same email OR phone ever applied to this job)
+            existing_application = storage_service.check_duplicate_application(
+                email=email, 
+                phone=phone, 
+                job_id=job_id
+            )
+            if existing_application:
+                logger.warning("⚠️ DUPLICATE (EXISTING): %s already applied to job %s", email or phone, job_id)
+                if claim_key:
+                    cache_service.set_application_claim(claim_key, existing_application.get('id'))
+                return jsonify({
+                    "status": "duplicate",
+                    "message": "You have already applied for this position.",
+                    "existing_id": existing_application.get('id'),
+                    "applied_at": existing_application.get('timestamp')
+                }), 200
+
+            # 1. Save Pending Application IMMEDIATELY (Critical for Vercel)
+            candidate_id = save_pending_application(data)
+        except Exception:
+            if claim_key:
+                cache_service.release_application_claim(claim_key)
+            raise
+        if claim_key:
+            if candidate_id:
+                cache_service.set_application_claim(claim_key, candidate_id)
+            else:
+                cache_service.release_application_claim(claim_key)
         
         # 2. Process Application
         # For Vercel/Serverless, we must process SYNCHRONOUSLY to ensure it finishes.
         # Background threads are often killed in serverless environments.
         base_url = request.url_root 
         
-        if os.environ.get('VERCEL') or os.environ.get('RAILWAY_ENVIRONMENT'):
-            print("Running in Serverless mode (Synchronous processing)")
+        # With a worker deployed, hand off and answer immediately instead of
+        # downloading/scoring inside the request (avoids serverless timeouts and
+        # Zapier retries). Falls through to inline processing if Redis is unavailable.
+        if candidate_id and _enqueue_application(data, candidate_id, base_url):
+            logger.info("Queued application %s for the worker", candidate_id)
+            return jsonify({"status": "queued", "message": "Application received.", "candidate_id": candidate_id}), 202
+        
+        if IS_SERVERLESS:
+            logger.info("Running in Serverless mode (Synchronous processing)")
             process_application_background(data, candidate_id, base_url)
         else:
-            print("Running in Server mode (Background thread)")
-            import threading
-            thread = threading.Thread(target=process_application_background, args=(data, candidate_id, base_url))
-            thread.start()
+            logger.info("Running in Server mode (Background thread)")
+            _submit_application(data, candidate_id, base_url)
         
         return jsonify({"status": "success", "message": "Application received and processed."}), 200
 
     except Exception as e:
-        print(f"Error in webhook: {e}")
+        logger.error("Error in webhook: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def _application_claim_key(job_id, email, phone, resume_url):
+    """Idempotency key for a webhook submission, or None without an email or phone"""
+    identity = (email or phone or '').strip().lower()
+    if not identity:
+        return None
+    digest = hashlib.blake2b(f"{job_id}|{identity}|{resume_url or ''}".encode('utf-8'), digest_size=16)
+    return digest.hexdigest()
+
+def _enqueue_application(data, candidate_id, base_url=None, skip_emails=False, parsed_resume=None):
+    """Queue an application for worker.py; False when no worker is deployed or Redis is unavailable"""
+    if not os.environ.get('APPLICATION_WORKER'):
+        return False
+    return cache_service.enqueue(APPLICATION_QUEUE, {
+        'data': data,
+        'candidate_id': candidate_id,
+        'base_url': base_url,
+        'skip_emails': skip_emails,
+        'parsed_resume': parsed_resume
+    })
+
+def _submit_application(data, candidate_id, base_url=None, **kwargs):
+    """Process an application on application_executor, logging when its backlog grows large"""
+    global _application_backlog
+    with _application_backlog_lock:
+        _application_backlog += 1
+        backlog = _application_backlog
+    if backlog > APPLICATION_BACKLOG_WARNING:
+        # Queued applications are lost if this process exits; requeue_stale_applications recovers them
+        logger.warning("Application backlog at %s (warning threshold %s)", backlog, APPLICATION_BACKLOG_WARNING)
+    future = application_executor.submit(process_application_background, data, candidate_id, base_url, **kwargs)
+    future.add_done_callback(_application_finished)
+    return future
+
+
+def _application_finished(_future):
+    global _application_backlog
+    with _application_backlog_lock:
+        _application_backlog -= 1
+
+
 def save_pending_application(data):
     """Save raw application data immediately to prevent data loss on serverless"""
     try:
@@ -884,26 +1786,26 @@ def save_pending_application(data):
         
         # VALIDATION: Ensure job_id is present and valid
         if not job_id:
-            print("❌ ERROR: Attempting to save candidate without job_id!")
+            logger.error("❌ Attempting to save candidate without job_id!")
             # Try to find an active job as fallback
             all_jobs = storage_service.get_all_jobs()
             active_jobs = [j for j in all_jobs if j.get('status') == 'active']
             if active_jobs:
                 active_jobs.sort(key=lambda x: x.get('created_at', ''), reverse=True)
                 job_id = active_jobs[0]['id']
-                print(f"✓ Fallback: Assigned to job {job_id}")
+                logger.info("✓ Fallback: Assigned to job %s", job_id)
             else:
-                print("❌ No jobs available - candidate will have no job_id")
+                logger.error("❌ No jobs available - candidate will have no job_id")
         
         # Validate that job exists
         if job_id:
             job = storage_service.get_job(job_id)
             if not job:
-                print(f"⚠️ WARNING: job_id '{job_id}' does not exist in database!")
+                logger.warning("⚠️ job_id '%s' does not exist in database!", job_id)
         
         # Create a basic candidate object
         candidate_data = {
-            'id': f"cand_{int(datetime.now().timestamp())}_{uuid.uuid4().hex[:8]}",
+            'id': f"cand_{int(datetime.now().timestamp())}_{token_hex(4)}",
             'job_id': job_id,
             'name': name,
             'email': email,
@@ -925,13 +1827,13 @@ def save_pending_application(data):
         # Invalidate candidates cache for this job
         cache_service.invalidate_candidates(job_id)
         
-        print(f"Saved pending application: {candidate_data['id']}")
+        logger.info("Saved pending application: %s", candidate_data['id'])
         return candidate_data['id']
     except Exception as e:
-        print(f"Error saving pending application: {e}")
+        logger.error("Error saving pending application: %s", e)
         return None
 
-def process_application_background(data, candidate_id=None, base_url=None, skip_emails=False):
+def process_application_background(data, candidate_id=None, base_url=None, skip_emails=False, parsed_resume=None):
     """Process the application in the background to avoid timeouts
     
     Args:
@@ -939,6 +1841,7 @@ def process_application_background(data, candidate_id=None, base_url=None, skip_
         candidate_id: Optional ID if updating existing candidate
         base_url: Base URL for links in emails
         skip_emails: If True, skip sending emails (used for reprocessing)
+        parsed_resume: Resume parse stored with the candidate (used for reprocessing)
     """
     with app.app_context():
         try:
@@ -967,65 +1870,62 @@ def process_application_background(data, candidate_id=None, base_url=None, skip_
                 candidate_info['job_id'] = data.get('job_id')
 
             
-            if resume_url:
+            # Reprocessing reuses the parse stored with the candidate on the first run,
+            # skipping the download and text extraction, unless the resume URL changed
+            stored_parse = None
+            if parsed_resume and resume_url and parsed_resume.get('resume_url') == resume_url:
+                logger.debug("Reusing stored resume parse for %s", resume_url)
+                stored_parse = parsed_resume
+                candidate_info.update({k: v for k, v in parsed_resume.items() if k != 'resume_url'})
+                _prefer_form_fields(candidate_info, name, email, phone)
+                resume_text = candidate_info.get('raw_text', '')
+            elif resume_url:
+                response = None
+                downloaded_path = None  # Set when gdown already wrote the file to disk
                 try:
                     # Fix Google Drive URLs for direct download
                     if 'drive.google.com' in resume_url:
                         # Extract file ID from various Google Drive URL formats
-                        import re
-                        file_id_match = re.search(r'/d/([a-zA-Z0-9_-]+)', resume_url) or re.search(r'id=([a-zA-Z0-9_-]+)', resume_url)
+                        file_id_match = DRIVE_FILE_ID_RE.search(resume_url)
                         if file_id_match:
                             file_id = file_id_match.group(1)
                             # Use the correct Google Drive direct download URL
                             resume_url = f"https://drive.google.com/uc?export=download&id={file_id}"
-                            print(f"Converted Google Drive URL: {resume_url}")
+                            logger.debug("Converted Google Drive URL: %s", resume_url)
                     
                     # Download resume
                     # Hybrid approach: Try gdown first, then robust requests fallback
-                    import gdown
-                    
                     # Create a temporary file path
                     ext = '.pdf' # Default assumption
-                    temp_filename = f"temp_download_{uuid.uuid4().hex}{ext}"
-                    temp_path = os.path.join(app.config['UPLOAD_FOLDER'], temp_filename)
+                    temp_filename = f"temp_download_{token_hex(16)}{ext}"
+                    temp_path = os.path.join(UPLOAD_FOLDER, temp_filename)
                     
-                    print(f"Attempting download with gdown: {resume_url}")
-                    response = None
+                    logger.debug("Attempting download with gdown: %s", resume_url)
                     
                     try:
+                        # Imported here: gdown (and its tqdm/filelock deps) is only needed
+                        # for application downloads, so other routes skip it on cold start
+                        import gdown
+                        
                         # gdown handles the virus scan warning automatically
-                        output_path = gdown.download(resume_url, temp_path, quiet=False, fuzzy=True)
+                        output_path = gdown.download(resume_url, temp_path, quiet=True, fuzzy=True)
                         
                         if output_path and os.path.exists(output_path):
-                            print(f"gdown download successful: {output_path}")
-                            
-                            # Read content
-                            with open(output_path, 'rb') as f:
-                                file_content = f.read()
-                            
-                            # Clean up temp file
-                            try:
-                                os.remove(output_path)
-                            except:
-                                pass
-                                
-                            # Mock a response object
-                            class MockResponse:
-                                def __init__(self, content):
-                                    self.content = content
-                                    self.status_code = 200
-                                    self.headers = {'Content-Type': 'application/pdf'} # Assume PDF
-                                    self.cookies = {}
+                            logger.info("gdown download successful: %s", output_path)
                             
-                            response = MockResponse(file_content)
+                            # Keep the file on disk; it is moved into place below
+                            downloaded_path = output_path
+                            status_code = 200
+                            headers = {'Content-Type': 'application/pdf'}  # gdown gives no headers; assume PDF
                     except Exception as gdown_error:
-                        print(f"gdown failed: {gdown_error}")
+                        logger.warning("gdown failed: %s", gdown_error)
                     
                     # Fallback if gdown failed or didn't return a file
-                    if not response:
-                        print("Falling back to requests with cookie handling...")
-                        session = requests.Session()
-                        response = session.get(resume_url, allow_redirects=True, timeout=30)
+                    if not downloaded_path:
+                        logger.info("Falling back to requests with cookie handling...")
+                        session = new_download_session()
+                        # Stream the body so large resumes are never fully buffered in memory
+                        response = session.get(resume_url, allow_redirects=True, timeout=RESUME_DOWNLOAD_TIMEOUT, stream=True)
                         
                         # Check for Google Drive virus scan warning (HTML response)
                         if response.status_code == 200 and ('text/html' in response.headers.get('Content-Type', '').lower()):
@@ -1033,43 +1933,51 @@ def process_application_background(data, candidate_id=None, base_url=None, skip_
                             for key, value in response.cookies.items():
                                 if key.startswith('download_warning'):
                                     # Retry with confirmation token
-                                    print(f"Found Google Drive confirmation token: {value}")
+                                    logger.debug("Found Google Drive confirmation token: %s", value)
+                                    response.close()
                                     params = {'confirm': value}
                                     if 'id=' in resume_url:
-                                        response = session.get(resume_url + f"&confirm={value}", allow_redirects=True, timeout=30)
+                                        response = session.get(resume_url + f"&confirm={value}", allow_redirects=True, timeout=RESUME_DOWNLOAD_TIMEOUT, stream=True)
                                     else:
-                                        response = session.get(resume_url, params=params, allow_redirects=True, timeout=30)
+                                        response = session.get(resume_url, params=params, allow_redirects=True, timeout=RESUME_DOWNLOAD_TIMEOUT, stream=True)
                                     break
+                        
+                        status_code = response.status_code
+                        headers = response.headers
+                    
+                    logger.debug("Download status: %s, Content-Type: %s", status_code, headers.get('Content-Type'))
                     
-                    print(f"Download status: {response.status_code}, Content-Type: {response.headers.get('Content-Type')}, Size: {len(response.content)} bytes")
+                    # Peek at the start of the body (for the HTML check) without reading the rest
+                    chunks = None
+                    head = b''
+                    if status_code == 200:
+                        if downloaded_path:
+                            with open(downloaded_path, 'rb') as f:
+                                head = f.read(HTML_SNIFF_BYTES)
+                        else:
+                            chunks = response.iter_content(chunk_size=64 * 1024)
+                            head = next(chunks, b'')
                     
-                    if response.status_code == 200:
+                    if status_code == 200:
+                        content_type = headers.get('Content-Type', '').lower()
+                        
                         # Check if we STILL got HTML instead of a file
-                        if response.content[:100].lower().find(b'<!doctype html') != -1 or response.content[:100].lower().find(b'<html') != -1:
-                            print("WARNING: Received HTML instead of file. Google Drive may require confirmation.")
+                        if _is_html_download(content_type, head):
+                            logger.warning("Received HTML instead of file. Google Drive may require confirmation.")
                             candidate_info['raw_text'] = f"Resume download blocked by Google Drive. Please use a direct file link or public URL.\nOriginal URL: {resume_url}"
                             resume_text = candidate_info['raw_text']
                         else:
                             # Determine extension from Content-Type or Content-Disposition
-                            content_type = response.headers.get('Content-Type', '').lower()
-                            content_disposition = response.headers.get('Content-Disposition', '')
+                            content_disposition = headers.get('Content-Disposition', '')
                             
-                            ext = '.pdf' # Default
+                            ext = next((e for sub, e in DOWNLOAD_MIME_EXTENSIONS if sub in content_type), '.pdf')
                             filename = "resume" # Default filename base
                             
-                            if 'application/pdf' in content_type:
-                                ext = '.pdf'
-                            elif 'wordprocessingml' in content_type or 'msword' in content_type:
-                                ext = '.docx'
-                            elif 'text/plain' in content_type:
-                                ext = '.txt'
-                            
                             # Check content disposition for filename
                             if 'filename=' in content_disposition:
                                 # Try to extract extension from filename in header
-                                fname_match = re.search(r'filename="?([^"]+)"?', content_disposition)
-                                if fname_match:
-                                    fname = fname_match.group(1)
+                                fname = _content_disposition_filename(content_disposition)
+                                if fname:
                                     filename = fname
                                     _, extracted_ext = os.path.splitext(fname)
                                     if extracted_ext:
@@ -1079,50 +1987,88 @@ def process_application_background(data, candidate_id=None, base_url=None, skip_
                             if not os.path.splitext(filename)[1]:
                                 filename = f"{filename}{ext}"
 
-                            # Save persistently
-                            unique_filename = f"{uuid.uuid4().hex}_{filename}"
-                            file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
+                            # Save persistently, under the content hash so a resume that is
+                            # submitted again (or shared by several applicants) keeps one copy
+                            resume_bytes = None  # Body bytes when the resume is parsed from memory
                             
-                            with open(file_path, 'wb') as f:
-                                f.write(response.content)
-                            print(f"Saved file: {unique_filename} ({len(response.content)} bytes)")
+                            if downloaded_path:
+                                size = os.path.getsize(downloaded_path)
+                                unique_filename = _content_upload_name(file_fingerprint(downloaded_path), filename)
+                                file_path = os.path.join(UPLOAD_FOLDER, unique_filename)
+                                os.replace(downloaded_path, file_path)
+                                downloaded_path = None
+                            else:
+                                # Small resumes are parsed from memory. Serverless keeps no local
+                                # copy (file_url is the original URL there); elsewhere it is saved
+                                # in the background while parsing and scoring run.
+                                resume_bytes, consumed = _read_small_body(head, chunks, IN_MEMORY_PARSE_LIMIT)
+                                if resume_bytes is not None:
+                                    size = len(resume_bytes)
+                                    unique_filename = _content_upload_name(_content_digest(resume_bytes), filename)
+                                    file_path = os.path.join(UPLOAD_FOLDER, unique_filename)
+                                    if not IS_SERVERLESS and not os.path.exists(file_path):
+                                        upload_writer.submit(_save_upload_bytes, file_path, resume_bytes)
+                                else:
+                                    # Hashed while streaming to a scratch name, then moved into place
+                                    h = hashlib.blake2b(digest_size=16)
+                                    part_path = os.path.join(UPLOAD_FOLDER, _unique_upload_name(filename))
+                                    try:
+                                        size = _write_chunks(part_path, itertools.chain(consumed, chunks),
+                                                             max_bytes=app.config['MAX_CONTENT_LENGTH'], hasher=h)
+                                    except RequestEntityTooLarge:
+                                        raise Exception(f"Resume exceeds {app.config['MAX_CONTENT_LENGTH']} bytes")
+                                    unique_filename = _content_upload_name(h.hexdigest(), filename)
+                                    file_path = os.path.join(UPLOAD_FOLDER, unique_filename)
+                                    os.replace(part_path, file_path)
+                            logger.info("Downloaded file: %s (%s bytes)", unique_filename, size)
+                            
+                            # Body is read; release the connection before the slow parse/AI steps
+                            if response is not None:
+                                response.close()
                         
                             # Parse
                             try:
-                                parsed_info = resume_parser.parse_resume(file_path, filename)
+                                parsed_info = resume_parser.parse_resume(file_path, filename, data=resume_bytes)
                                 
                                 # Merge parsed info but PREFER form data for critical fields
                                 # This prevents "Robotics AI" (from resume text) overwriting "Candidate Name" (from form)
                                 candidate_info.update(parsed_info)
                                 
                                 # FORCE override with form data if available
-                                if name and name != 'Unknown Candidate':
-                                    candidate_info['name'] = name
-                                if email:
-                                    candidate_info['email'] = email
-                                if phone:
-                                    candidate_info['phone'] = phone
+                                _prefer_form_fields(candidate_info, name, email, phone)
                                     
                                 if 'raw_text' not in candidate_info or not candidate_info['raw_text']:
                                     candidate_info['raw_text'] = f"Resume parsing failed. Resume URL: {resume_url}"
                                 resume_text = candidate_info.get('raw_text', '')
-                                print(f"Successfully parsed resume: {len(resume_text)} characters")
+                                logger.info("Successfully parsed resume: %s characters", len(resume_text))
                                 
                                 # Add file URL for frontend access
                                 # In Vercel/Cloud, local files are ephemeral. Use original URL.
-                                if os.environ.get('VERCEL') or os.environ.get('RAILWAY_ENVIRONMENT'):
+                                if IS_SERVERLESS:
                                     candidate_info['file_url'] = resume_url
                                 else:
                                     candidate_info['file_url'] = f"/uploads/{unique_filename}"
                                 
                                 candidate_info['original_filename'] = filename
                                 
+                                # Stored with the candidate right away, so a reprocess after a
+                                # later failure (AI, scoring) skips the download and parse
+                                if 'error' not in parsed_info and parsed_info.get('raw_text'):
+                                    stored_parse = {
+                                        **parsed_info,
+                                        'file_url': candidate_info['file_url'],
+                                        'original_filename': filename,
+                                        'resume_url': data.get('resume_url')
+                                    }
+                                    if candidate_id:
+                                        storage_service.update_parsed_resume(candidate_id, stored_parse)
+                                
                             except Exception as parse_error:
-                                print(f"Error parsing resume: {parse_error}")
+                                logger.error("Error parsing resume: %s", parse_error)
                                 candidate_info['raw_text'] = f"Resume parsing error: {str(parse_error)}\nResume URL: {resume_url}"
                                 resume_text = candidate_info['raw_text']
                                 # Still provide file access even if parsing failed
-                                if os.environ.get('VERCEL') or os.environ.get('RAILWAY_ENVIRONMENT'):
+                                if IS_SERVERLESS:
                                     candidate_info['file_url'] = resume_url
                                 else:
                                     candidate_info['file_url'] = f"/uploads/{unique_filename}"
@@ -1130,36 +2076,62 @@ def process_application_background(data, candidate_id=None, base_url=None, skip_
                             
                             # Do NOT remove file so it can be viewed later
                 except Exception as e:
-                    print(f"Error downloading/parsing resume: {e}")
+                    logger.error("Error downloading/parsing resume: %s", e)
                     # Fallback if download fails
                     candidate_info['raw_text'] = f"Resume URL: {resume_url}"
                     resume_text = candidate_info['raw_text']
                     # Ensure file_url is set so the user can still view it
                     candidate_info['file_url'] = resume_url
                     candidate_info['parsing_failed'] = True
+                finally:
+                    # Release the download even when it failed part-way (e.g. size cap)
+                    if response is not None:
+                        response.close()
+                    # Drop a gdown temp file that was never moved into place (e.g. HTML page)
+                    if downloaded_path:
+                        try:
+                            os.remove(downloaded_path)
+                        except FileNotFoundError:
+                            pass
             
             # If we have answers but no resume text, append answers to text for analysis
             if answers:
-                answers_text = "\n".join([f"Q: {k}\nA: {v}" for k, v in answers.items()])
-                candidate_info['raw_text'] += f"\n\nInterview Answers:\n{answers_text}"
+                candidate_info['raw_text'] = "\n".join(itertools.chain(
+                    (candidate_info['raw_text'], "\nInterview Answers:"),
+                    (f"Q: {k}\nA: {v}" for k, v in answers.items())
+                ))
                 resume_text = candidate_info['raw_text']
 
-            # 2. AI Analysis
-            ai_analysis = analyze_candidate_with_ai(
+            # 2. AI Analysis, started in the background: the work below does not depend
+            # on it and overlaps the provider round-trip
+            ai_future = background_executor.submit(
+                analyze_candidate_with_ai,
                 resume_text, 
                 job_description, 
                 interview_answers=answers
             )
             
-            # 3. Score
-            print(f"Scoring candidate with {len(candidate_info.get('skills', []))} skills against JD of length {len(job_description)}")
+            # The confirmation needs nothing from the AI analysis or score, so the
+            # candidate hears back while the AI call runs and a scoring failure
+            # cannot swallow it
+            if not skip_emails and candidate_info.get('email'):
+                email_service.send_candidate_confirmation(
+                    candidate_info['email'], candidate_info.get('name'),
+                    _application_job_title(data, candidate_info.get('job_id'))
+                )
+            
+            # 3. Score: AI-independent components first, the rest once the analysis is in
+            precomputed = candidate_scorer.precompute_scores(candidate_info, job_description)
+            ai_analysis = ai_future.result()
+            logger.debug("Scoring candidate with %s skills against JD of length %s", len(candidate_info.get('skills', [])), len(job_description))
             score_result = candidate_scorer.score_candidate(
                 candidate_info,
                 job_description,
                 "Job Application", # Generic title if not provided
-                ai_analysis=ai_analysis
+                ai_analysis=ai_analysis,
+                precomputed=precomputed
             )
-            print(f"Score result: {score_result['total_score']} (Skills: {score_result['breakdown']['skills_match']})")
+            logger.debug("Score result: %s (Skills: %s)", score_result['total_score'], score_result['breakdown']['skills_match'])
             
             # 4. Save
             # Ensure we preserve the ID and job_id if they were passed
@@ -1170,6 +2142,9 @@ def process_application_background(data, candidate_id=None, base_url=None, skip_
             if data.get('job_id'):
                 score_result['job_id'] = data.get('job_id')
             
+            if stored_parse:
+                score_result['parsed_resume'] = stored_parse
+            
             # Mark as processed (not pending anymore) - prevents duplicate processing
             # Note: Kanban frontend maps 'processed' to 'applied' column for display
             score_result['status'] = 'processed'
@@ -1179,27 +2154,41 @@ def process_application_background(data, candidate_id=None, base_url=None, skip_
             # Invalidate candidates cache for this job
             cache_service.invalidate_candidates(score_result.get('job_id'))
             
-            print("Candidate saved successfully with status: processed")
+            logger.info("Candidate saved successfully with status: processed")
             
             # 5. Send Emails (only if not skipped)
             if skip_emails:
-                print("Skipping emails (reprocessing mode)")
+                logger.info("Skipping emails (reprocessing mode)")
             else:
-                print("Sending notifications...")
-                
-                # Send Candidate Confirmation
-                cand_email = score_result.get('candidate_email') or score_result.get('email')
-                cand_name = score_result.get('candidate_name') or score_result.get('name')
-                job_title = data.get('job_title') or score_result.get('job_title')
+                logger.info("Sending notifications...")
                 
-                if cand_email:
-                    email_service.send_candidate_confirmation(cand_email, cand_name, job_title)
-                
-                # Send Admin Notification
+                # Send Admin Notification (the candidate confirmation went out before scoring)
                 email_service.send_admin_notification(score_result, base_url)
             
         except Exception as e:
-            print(f"Error in background processing: {e}")
+            logger.error("Error in background processing: %s", e)
+
+
+def _application_job_title(data, job_id):
+    """Job title for candidate emails: the form's, else the title of the job it was matched to"""
+    if data.get('job_title'):
+        return data['job_title']
+    if not job_id:
+        return None
+    cached_jobs = cache_service.get_jobs()
+    jobs = cached_jobs if cached_jobs is not None else _load_jobs()
+    job = next((j for j in jobs if j.get('id') == job_id), None)
+    return job.get('title') if job else None
+
+
+def _prefer_form_fields(candidate_info, name, email, phone):
+    """Override parsed contact details with what the candidate typed into the form"""
+    if name and name != 'Unknown Candidate':
+        candidate_info['name'] = name
+    if email:
+        candidate_info['email'] = email
+    if phone:
+        candidate_info['phone'] = phone
 
 
 @app.route('/api/candidates', methods=['GET'])
@@ -1373,8 +2362,7 @@ def process_candidate_manual(candidate_id):
     """Manually trigger processing for a pending candidate"""
     try:
         # 1. Get candidate from DB
-        candidates = storage_service.get_all_candidates()
-        candidate = next((c for c in candidates if c['id'] == candidate_id), None)
+        candidate = storage_service.get_candidate(candidate_id)
         
         if not candidate:
             return jsonify({'success': False, 'error': 'Candidate not found'}), 404
@@ -1382,35 +2370,88 @@ def process_candidate_manual(candidate_id):
         # 2. Check if already processed (prevent double processing)
         current_status = candidate.get('status', '')
         if current_status == 'processed' or current_status == 'applied' or current_status == 'interview_scheduled' or current_status == 'rejected':
-            print(f"Candidate {candidate_id} already processed (status: {current_status}), skipping.")
+            logger.info("Candidate %s already processed (status: %s), skipping.", candidate_id, current_status)
             return jsonify({'success': True, 'message': 'Candidate already processed', 'skipped': True})
         
         # Also check if we have a valid score already
         if candidate.get('total_score', 0) > 0 and candidate.get('ai_analysis') and not candidate.get('ai_analysis', {}).get('summary', '').startswith('Processing Pending'):
-            print(f"Candidate {candidate_id} has valid score ({candidate.get('total_score')}), skipping reprocess.")
+            logger.info("Candidate %s has valid score (%s), skipping reprocess.", candidate_id, candidate.get('total_score'))
             # Update status to applied if it was stuck on pending
             storage_service.update_status(candidate_id, 'applied')
             return jsonify({'success': True, 'message': 'Candidate already has score', 'skipped': True})
             
         # 3. Re-construct data object from stored raw_data or fields
-        data = candidate.get('raw_data') or {
-            'name': candidate.get('name'),
-            'email': candidate.get('email'),
-            'phone': candidate.get('phone'),
-            'resume_url': candidate.get('resume_url'),
-            'job_description': candidate.get('job_description'),
-            'answers': candidate.get('answers')
-        }
+        data = _candidate_application_data(candidate)
+        
+        # The resume parse stored on the first run lets reprocessing skip download and parsing
+        parsed_resume = candidate.get('parsed_resume')
         
-        # 4. Run processing synchronously (since user clicked the button)
+        # 4. Hand off to the worker when one is deployed, so the request returns at once.
         # Pass skip_emails=True since emails were already sent on first process
-        process_application_background(data, candidate_id, skip_emails=True)
+        if _enqueue_application(data, candidate_id, skip_emails=True, parsed_resume=parsed_resume):
+            return jsonify({'success': True, 'message': 'Candidate queued for processing', 'queued': True}), 202
+        
+        # Otherwise run processing synchronously (since user clicked the button)
+        process_application_background(data, candidate_id, skip_emails=True, parsed_resume=parsed_resume)
         
         return jsonify({'success': True, 'message': 'Candidate processed successfully'})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def _candidate_application_data(candidate):
+    """Application data for reprocessing a stored candidate: its raw_data, or its own fields"""
+    return candidate.get('raw_data') or {
+        'name': candidate.get('name'),
+        'email': candidate.get('email'),
+        'phone': candidate.get('phone'),
+        'resume_url': candidate.get('resume_url'),
+        'job_description': candidate.get('job_description'),
+        'answers': candidate.get('answers')
+    }
+
+
+def requeue_stale_applications():
+    """
+    Process again applications still 'pending' STALE_PENDING_MINUTES after they were
+    received. Each is retried automatically once (the first process to mark it wins);
+    after that it stays pending for the dashboard's reprocess. Emails are skipped as
+    for a manual reprocess, since the first attempt may already have sent them.
+    Returns the number of applications requeued.
+    """
+    received_before = (datetime.now() - timedelta(minutes=STALE_PENDING_MINUTES)).isoformat()
+    requeued = 0
+    for candidate in storage_service.get_stale_pending_candidates(received_before):
+        candidate_id = candidate['id']
+        if not storage_service.mark_requeued(candidate_id):
+            continue
+        data = _candidate_application_data(candidate)
+        parsed_resume = candidate.get('parsed_resume')
+        if not _enqueue_application(data, candidate_id, skip_emails=True, parsed_resume=parsed_resume):
+            _submit_application(data, candidate_id, skip_emails=True, parsed_resume=parsed_resume)
+        requeued += 1
+    if requeued:
+        logger.warning("Requeued %s application(s) left pending for over %s minutes", requeued, STALE_PENDING_MINUTES)
+    return requeued
+
+
+def _sweep_stale_applications():
+    """Background loop: recover applications whose in-memory job died with a recycled worker"""
+    while True:
+        try:
+            requeue_stale_applications()
+        except Exception as e:
+            logger.error("Could not requeue stale applications: %s", e)
+        time.sleep(STALE_PENDING_MINUTES * 60)
+
+
+# Each web process sweeps at startup and then periodically (mark_requeued keeps
+# processes from retrying the same application). Serverless functions do not live
+# long enough; there, pending applications are reprocessed from the dashboard.
+if not IS_SERVERLESS:
+    threading.Thread(target=_sweep_stale_applications, name='stale-application-sweep', daemon=True).start()
+
+
 # ============================================================
 # ANALYTICS API
 # ============================================================
@@ -1440,9 +2481,8 @@ def bulk_reject():
     if not candidate_ids:
         return jsonify({'success': False, 'error': 'No candidate IDs provided'}), 400
     
-    # Get all candidates first to get their details
-    all_candidates = storage_service.get_all_candidates()
-    candidates_map = {c['id']: c for c in all_candidates}
+    # Fetch just the selected candidates to get their details
+    candidates_map = {c['id']: c for c in storage_service.get_candidates_by_ids(candidate_ids)}
     
     rejected = 0
     emails_sent = 0
@@ -1560,9 +2600,6 @@ def check_duplicate():
 @app.route('/api/export/candidates', methods=['GET'])
 def export_candidates_csv():
     """Export candidates to CSV with optional filters"""
-    import csv
-    from io import StringIO
-    
     # Get filter parameters
     job_id = request.args.get('job_id')
     status = request.args.get('status')
@@ -1581,46 +2618,67 @@ def export_candidates_csv():
     if max_score is not None:
         candidates = [c for c in candidates if (c.get('total_score') or c.get('score') or 0) <= max_score]
     
-    # Create CSV
-    output = StringIO()
-    writer = csv.writer(output)
-    
-    # Header
-    writer.writerow([
-        'Name', 'Email', 'Phone', 'Job Title', 'Score', 'Status', 
-        'Skills Match', 'Experience', 'Education', 'Applied Date', 
-        'LinkedIn', 'Resume URL', 'Tags', 'Notes'
-    ])
-    
-    # Data rows
-    for c in candidates:
-        breakdown = c.get('breakdown', {})
-        writer.writerow([
-            c.get('candidate_name') or c.get('name', ''),
-            c.get('candidate_email') or c.get('email', ''),
-            c.get('candidate_phone') or c.get('phone', ''),
-            c.get('job_title', 'Unassigned'),
-            c.get('total_score') or c.get('score', 0),
-            c.get('status', 'applied'),
-            breakdown.get('skills_match', 0),
-            breakdown.get('experience', 0),
-            breakdown.get('education', 0),
-            c.get('timestamp', '')[:10] if c.get('timestamp') else '',
-            c.get('linkedin_url', ''),
-            c.get('resume_url', ''),
-            ', '.join(c.get('tags', [])),
-            c.get('notes', '')
-        ])
-    
-    output.seek(0)
+    # Stream the CSV in blocks of rows instead of building the whole file in memory
+    chunks = _csv_stream(
+        (
+            'Name', 'Email', 'Phone', 'Job Title', 'Score', 'Status', 
+            'Skills Match', 'Experience', 'Education', 'Applied Date', 
+            'LinkedIn', 'Resume URL', 'Tags', 'Notes'
+        ),
+        map(_candidate_csv_row, candidates)
+    )
     
     return Response(
-        output.getvalue(),
+        stream_with_context(chunks),
         mimetype='text/csv',
         headers={'Content-Disposition': 'attachment; filename=candidates_export.csv'}
     )
 
 
+# Rows written per streamed chunk of a CSV export
+CSV_EXPORT_BLOCK_ROWS = 100
+
+
+def _csv_stream(header, rows, block_rows=CSV_EXPORT_BLOCK_ROWS, **writer_options):
+    """
+    Yield a CSV export as text chunks of up to block_rows rows (the first chunk
+    starts with the header), reusing one buffer so memory stays O(block).
+    """
+    output = io.StringIO()
+    writer = csv.writer(output, **writer_options)
+    writer.writerow(header)
+    rows = iter(rows)
+    while True:
+        writer.writerows(itertools.islice(rows, block_rows))
+        chunk = output.getvalue()
+        if not chunk:
+            return
+        yield chunk
+        output.seek(0)
+        output.truncate()
+
+
+def _candidate_csv_row(c):
+    """Flatten a candidate record into a candidates-export CSV row"""
+    breakdown = c.get('breakdown', {})
+    return [
+        c.get('candidate_name') or c.get('name', ''),
+        c.get('candidate_email') or c.get('email', ''),
+        c.get('candidate_phone') or c.get('phone', ''),
+        c.get('job_title', 'Unassigned'),
+        c.get('total_score') or c.get('score', 0),
+        c.get('status', 'applied'),
+        breakdown.get('skills_match', 0),
+        breakdown.get('experience', 0),
+        breakdown.get('education', 0),
+        c.get('timestamp', '')[:10] if c.get('timestamp') else '',
+        c.get('linkedin_url', ''),
+        c.get('resume_url', ''),
+        ', '.join(c.get('tags', [])),
+        c.get('notes', '')
+    ]
+
+
 # ============================================================
 # EMAIL TEMPLATES API
 # ============================================================
@@ -1731,5 +2789,7 @@ if __name__ == '__main__':
         
     else:
         # Standard Local Run (only if --no-ngrok is passed)
-        print(f"Starting Flask server on port {port} (Ngrok disabled)...")
-        app.run(host='0.0.0.0', port=port, debug=True)
+        # Debug/reloader only when explicitly requested; use gunicorn for production
+        debug = os.environ.get('FLASK_DEBUG') == '1' or os.environ.get('FLASK_ENV') == 'development'
+        print(f"Starting Flask server on port {port} (Ngrok disabled, debug={debug})...")
+        app.run(host='0.0.0.0', port=port, debug=debug)
@@ -0,0 +1,22 @@
+"""
+Gunicorn configuration - loaded automatically by `gunicorn app:app`
+(Procfile / render.yaml). Routes spend most of their time waiting on AI
+providers, webhooks and SMTP, so threaded workers give cheap concurrency.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 4)))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+# AI analysis and resume downloads can legitimately take a while
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+keepalive = 5
+# Worker heartbeat files live on tmpfs when available; on container disk
+# filesystems the per-request heartbeat write can stall workers
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+# Recycle workers periodically so memory held by PDF/DOCX parsing does not creep up
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = 100
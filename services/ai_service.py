@@ -1,8 +1,11 @@
 import os
 import json
+import hashlib
 import requests
+from requests.adapters import HTTPAdapter
 import threading
 import time
+from .cache_service import cache_service
 
 # API URLs
 PERPLEXITY_API_URL = "https://api.perplexity.ai/chat/completions"
@@ -12,11 +15,77 @@ CLAUDE_API_URL = "https://api.anthropic.com/v1/messages"
 # Default API key (Perplexity)
 DEFAULT_PERPLEXITY_KEY = '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'
 
+# Shared keep-alive session for AI provider calls, so repeat calls skip the
+# TCP/TLS handshake (one small pool per provider host; retries are handled here)
+_ai_session = requests.Session()
+_ai_session.mount('https://', HTTPAdapter(pool_connections=3, pool_maxsize=10, max_retries=0))
+
 # Rate limiting for concurrent AI requests
 _ai_lock = threading.Lock()
 _last_ai_call = 0
 _MIN_INTERVAL = 1.0  # Minimum 1 second between AI calls
 
+# Cap on concurrent candidate analyses per process, so a slow or down provider
+# ties up at most this many worker threads instead of the whole pool
+AI_MAX_CONCURRENCY = int(os.environ.get('AI_MAX_CONCURRENCY', '4'))
+_ai_slots = threading.BoundedSemaphore(AI_MAX_CONCURRENCY)
+
+# Per-request HTTP timeout (seconds) for candidate analysis calls
+AI_ANALYSIS_TIMEOUT = 60
+
+# Extra HTTP timeout (seconds) per additional candidate in a batched analysis call
+AI_BATCH_TIMEOUT_PER_CANDIDATE = 20
+
+
+# Evaluation rules shared by the single and batch candidate analysis prompts
+_ANALYSIS_RULES = """\
+    IMPORTANT RULES:
+    1. Assume all monetary values are in Indian Rupees (INR) unless explicitly stated otherwise.
+    2. If the resume is unconventional (e.g., code, raw text), infer skills and experience from context.
+    3. Analyze the "Candidate's Interview Answers" for signs of AI generation (e.g. overly perfect structure, robotic tone, lack of personal anecdotes, generic examples). Be lenient, only flag if obvious.
+    4. Be VERY CRITICAL. Do not give high scores easily:
+       - 90-100: Perfect match, rare unicorn candidate
+       - 75-89: Strong match, minor gaps
+       - 60-74: Decent match, some concerns
+       - 40-59: Weak match, significant gaps
+       - 0-39: Poor match, not recommended
+    5. Look for RED FLAGS: job hopping (<1 year stints), gaps, inconsistencies, keyword stuffing, vague descriptions.
+    6. Evaluate IMPACT over responsibility - did they BUILD, LEAD, IMPROVE, or just PARTICIPATE?
+    7. Consider RECENCY - recent experience in relevant tech is more valuable.\
+"""
+
+# Keys every candidate analysis must contain (shared by single and batch prompts)
+_ANALYSIS_KEYS = """\
+    - "pros": List of 3-5 specific strengths directly relevant to the job requirements. Be specific with examples from their profile.
+    - "cons": List of 3-5 specific gaps, weaknesses, or concerns relative to the job. Be honest and direct.
+    - "summary": A professional executive summary of the candidate's fit (2-3 sentences). Include hiring recommendation (Strong Yes / Yes / Maybe / No / Strong No).
+    - "score_adjustment": An integer between -20 and +20. Use this to fine-tune based on intangibles.
+    - "red_flags": List of any concerning patterns (empty list if none). Examples: "4 jobs in 3 years", "No quantifiable achievements", "Skills listed but no project evidence".
+    - "extracted_data": {
+        "skills": ["List", "of", "all", "technical", "skills", "found"],
+        "skills_match_score": <number 0-100: How well do candidate's skills match job requirements? Consider depth, not just presence.>,
+        "years_of_experience": <number or 0 if unknown>,
+        "education_level": "PhD|Masters|Bachelors|Diploma|HighSchool|Unknown",
+        "current_role": "Job Title or Unknown",
+        "current_company": "Company Name or Unknown",
+        "relevance_score": <number 0-100: How relevant is their RECENT experience to THIS specific job? Penalize heavily for keyword stuffing without project evidence.>,
+        "culture_fit_score": <number 0-100: Based on communication style, values shown, teamwork indicators>,
+        "technical_depth_score": <number 0-100: Junior (0-40), Mid (41-70), Senior (71-85), Staff/Principal (86-100). Look for evidence of IMPACT and COMPLEXITY, not just years.>,
+        "leadership_score": <number 0-100: Evidence of mentoring, leading teams, driving initiatives. 0 if IC role.>,
+        "communication_score": <number 0-100: Quality of writing in resume/answers. Clear, concise, professional?>,
+        "project_complexity_score": <number 0-100: Did they work on complex, impactful projects or routine tasks?>,
+        "growth_trajectory": "Rising|Stable|Declining|Unknown": Career progression pattern,
+        "missing_must_haves": ["List", "of", "critical", "skills", "or", "requirements", "missing"],
+        "nice_to_haves_present": ["List", "of", "bonus", "skills", "they", "have"],
+        "ai_generated_probability": <number 0-100: Likelihood that INTERVIEW ANSWERS were AI-generated. 0=Human, 100=Definitely AI. Be conservative.>,
+        "overall_recommendation": "Strong Hire|Hire|Maybe|No Hire|Strong No",
+        "salary_expectation_fit": "Unknown|Below|Match|Above" based on their level vs typical role
+    }\
+"""
+
+# Candidates per batched analysis call (keeps responses within output token limits)
+ANALYSIS_BATCH_SIZE = 5
+
 
 def _rate_limit():
     """Ensure minimum interval between AI API calls to avoid rate limits"""
@@ -29,10 +98,22 @@ def _rate_limit():
         _last_ai_call = time.time()
 
 
-def analyze_candidate_with_ai(resume_text, job_description, interview_answers=None, provider=None, api_key=None):
+def _busy_analysis():
+    """Placeholder analysis (no extracted_data, so keyword scoring applies) when no AI slot frees up"""
+    return {
+        "pros": ["AI analysis unavailable (provider busy)"],
+        "cons": ["AI analysis unavailable (provider busy)"],
+        "summary": "AI analysis timed out; scored on keywords only."
+    }
+
+
+def analyze_candidate_with_ai(resume_text, job_description, interview_answers=None, provider=None, api_key=None, timeout=AI_ANALYSIS_TIMEOUT):
     """
     Analyze a candidate's fit for a job using AI.
     Returns a dictionary with pros, cons, and analysis.
+    If no analysis slot frees up within `timeout` seconds, or the provider call
+    fails, returns a placeholder without extracted_data so the scorer falls back
+    to keyword scoring.
     """
     # Determine provider from env if not specified
     if not provider:
@@ -67,57 +148,25 @@ def analyze_candidate_with_ai(resume_text, job_description, interview_answers=No
     
     Task: Perform a DEEP, CRITICAL analysis of the candidate's fit and EXTRACT structured data.
     
-    IMPORTANT RULES:
-    1. Assume all monetary values are in Indian Rupees (INR) unless explicitly stated otherwise.
-    2. If the resume is unconventional (e.g., code, raw text), infer skills and experience from context.
-    3. Analyze the "Candidate's Interview Answers" for signs of AI generation (e.g. overly perfect structure, robotic tone, lack of personal anecdotes, generic examples). Be lenient, only flag if obvious.
-    4. Be VERY CRITICAL. Do not give high scores easily:
-       - 90-100: Perfect match, rare unicorn candidate
-       - 75-89: Strong match, minor gaps
-       - 60-74: Decent match, some concerns
-       - 40-59: Weak match, significant gaps
-       - 0-39: Poor match, not recommended
-    5. Look for RED FLAGS: job hopping (<1 year stints), gaps, inconsistencies, keyword stuffing, vague descriptions.
-    6. Evaluate IMPACT over responsibility - did they BUILD, LEAD, IMPROVE, or just PARTICIPATE?
-    7. Consider RECENCY - recent experience in relevant tech is more valuable.
+{_ANALYSIS_RULES}
     
     Provide a structured analysis in JSON format with the following keys:
-    - "pros": List of 3-5 specific strengths directly relevant to the job requirements. Be specific with examples from their profile.
-    - "cons": List of 3-5 specific gaps, weaknesses, or concerns relative to the job. Be honest and direct.
-    - "summary": A professional executive summary of the candidate's fit (2-3 sentences). Include hiring recommendation (Strong Yes / Yes / Maybe / No / Strong No).
-    - "score_adjustment": An integer between -20 and +20. Use this to fine-tune based on intangibles.
-    - "red_flags": List of any concerning patterns (empty list if none). Examples: "4 jobs in 3 years", "No quantifiable achievements", "Skills listed but no project evidence".
-    - "extracted_data": {{
-        "skills": ["List", "of", "all", "technical", "skills", "found"],
-        "skills_match_score": <number 0-100: How well do candidate's skills match job requirements? Consider depth, not just presence.>,
-        "years_of_experience": <number or 0 if unknown>,
-        "education_level": "PhD|Masters|Bachelors|Diploma|HighSchool|Unknown",
-        "current_role": "Job Title or Unknown",
-        "current_company": "Company Name or Unknown",
-        "relevance_score": <number 0-100: How relevant is their RECENT experience to THIS specific job? Penalize heavily for keyword stuffing without project evidence.>,
-        "culture_fit_score": <number 0-100: Based on communication style, values shown, teamwork indicators>,
-        "technical_depth_score": <number 0-100: Junior (0-40), Mid (41-70), Senior (71-85), Staff/Principal (86-100). Look for evidence of IMPACT and COMPLEXITY, not just years.>,
-        "leadership_score": <number 0-100: Evidence of mentoring, leading teams, driving initiatives. 0 if IC role.>,
-        "communication_score": <number 0-100: Quality of writing in resume/answers. Clear, concise, professional?>,
-        "project_complexity_score": <number 0-100: Did they work on complex, impactful projects or routine tasks?>,
-        "growth_trajectory": "Rising|Stable|Declining|Unknown": Career progression pattern,
-        "missing_must_haves": ["List", "of", "critical", "skills", "or", "requirements", "missing"],
-        "nice_to_haves_present": ["List", "of", "bonus", "skills", "they", "have"],
-        "ai_generated_probability": <number 0-100: Likelihood that INTERVIEW ANSWERS were AI-generated. 0=Human, 100=Definitely AI. Be conservative.>,
-        "overall_recommendation": "Strong Hire|Hire|Maybe|No Hire|Strong No",
-        "salary_expectation_fit": "Unknown|Below|Match|Above" based on their level vs typical role
-    }}
+{_ANALYSIS_KEYS}
     
     Return ONLY the JSON. No markdown, no explanation.
     """
 
+    if not _ai_slots.acquire(timeout=timeout):
+        print(f"⚠️ AI analysis skipped: all {AI_MAX_CONCURRENCY} slots busy for {timeout}s")
+        return _busy_analysis()
+
     try:
         if provider == 'openai':
-            return _call_openai_analysis(api_key, prompt)
+            return _call_openai_analysis(api_key, prompt, timeout=timeout)
         elif provider == 'claude':
-            return _call_claude_analysis(api_key, prompt)
+            return _call_claude_analysis(api_key, prompt, timeout=timeout)
         else:
-            return _call_perplexity_analysis(api_key, prompt)
+            return _call_perplexity_analysis(api_key, prompt, timeout=timeout)
             
     except Exception as e:
         print(f"AI Analysis Error: {e}")
@@ -126,8 +175,82 @@ def analyze_candidate_with_ai(resume_text, job_description, interview_answers=No
             "cons": ["Error during AI analysis"],
             "summary": "AI analysis failed."
         }
+    finally:
+        _ai_slots.release()
+
+def analyze_candidates_batch(resume_texts, job_description, provider=None, api_key=None, timeout=AI_ANALYSIS_TIMEOUT):
+    """
+    Analyze several candidates for the same job in a single AI call.
+    Returns a list of analysis dicts in input order, or None if the batch could
+    not be analyzed (callers should fall back to per-candidate analysis).
+    Takes one AI_MAX_CONCURRENCY slot; if none frees up within `timeout` seconds,
+    every candidate gets the busy placeholder rather than queueing again one by one.
+    The HTTP timeout grows with the batch size, and a timed-out batch is not retried
+    (the per-candidate fallback is cheaper than another full batch attempt).
+    """
+    if not resume_texts:
+        return None
+    
+    # Determine provider from env if not specified
+    if not provider:
+        provider = os.environ.get('AI_PROVIDER', 'perplexity').lower()
 
-def _call_perplexity_analysis(api_key, prompt):
+    if not api_key:
+        api_key = get_default_api_key(provider)
+        
+    if not api_key:
+        return None
+
+    count = len(resume_texts)
+    candidates_text = "\n".join(
+        f"    --- CANDIDATE {i} ---\n    {text[:2000]}\n" for i, text in enumerate(resume_texts, 1)
+    )
+
+    prompt = f"""
+    You are an expert Senior Recruiter and Hiring Manager with 15+ years experience. Evaluate each of the {count} candidates below for the specific role described.
+    
+    JOB TITLE & DESCRIPTION:
+    {job_description[:3000]}
+    
+    CANDIDATE PROFILES (Resumes):
+{candidates_text}
+    Task: Perform a DEEP, CRITICAL analysis of EACH candidate's fit independently and EXTRACT structured data.
+    
+{_ANALYSIS_RULES}
+    
+    Return a JSON object {{"candidates": [...]}} containing exactly {count} analyses, in the same order as the candidates above.
+    Each analysis must have the following keys:
+{_ANALYSIS_KEYS}
+    
+    Return ONLY the JSON. No markdown, no explanation.
+    """
+
+    if not _ai_slots.acquire(timeout=timeout):
+        print(f"⚠️ Batch AI analysis skipped: all {AI_MAX_CONCURRENCY} slots busy for {timeout}s")
+        return [_busy_analysis() for _ in resume_texts]
+
+    request_timeout = timeout + AI_BATCH_TIMEOUT_PER_CANDIDATE * (count - 1)
+    try:
+        if provider == 'openai':
+            result = _call_openai_analysis(api_key, prompt, timeout=request_timeout)
+        elif provider == 'claude':
+            result = _call_claude_analysis(api_key, prompt, max_tokens=1500 * count, timeout=request_timeout)
+        else:
+            result = _call_perplexity_analysis(api_key, prompt, timeout=request_timeout, retry_timeouts=False)
+    except Exception as e:
+        print(f"Batch AI Analysis Error: {e}")
+        return None
+    finally:
+        _ai_slots.release()
+    
+    analyses = result.get('candidates') if isinstance(result, dict) else result
+    if not isinstance(analyses, list) or len(analyses) != count:
+        print(f"Batch AI analysis returned an unexpected shape for {count} candidates, falling back")
+        return None
+    return [a if isinstance(a, dict) else None for a in analyses]
+
+
+def _call_perplexity_analysis(api_key, prompt, timeout=AI_ANALYSIS_TIMEOUT, retry_timeouts=True):
     # Rate limit to prevent API overload on concurrent submissions
     _rate_limit()
     
@@ -148,7 +271,7 @@ def _call_perplexity_analysis(api_key, prompt):
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            response = requests.post(PERPLEXITY_API_URL, headers=headers, json=data, timeout=60)
+            response = _ai_session.post(PERPLEXITY_API_URL, headers=headers, json=data, timeout=timeout)
             
             if response.status_code == 429:  # Rate limited
                 wait_time = (2 ** attempt) + 1  # 1, 3, 5 seconds
@@ -163,7 +286,7 @@ def _call_perplexity_analysis(api_key, prompt):
             
         except requests.exceptions.Timeout:
             print(f"API timeout on attempt {attempt + 1}")
-            if attempt < max_retries - 1:
+            if retry_timeouts and attempt < max_retries - 1:
                 time.sleep(2)
                 continue
             raise
@@ -175,7 +298,7 @@ def _call_perplexity_analysis(api_key, prompt):
     
     raise Exception("Max retries exceeded for Perplexity API")
 
-def _call_openai_analysis(api_key, prompt):
+def _call_openai_analysis(api_key, prompt, timeout=AI_ANALYSIS_TIMEOUT):
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json"
@@ -190,13 +313,13 @@ def _call_openai_analysis(api_key, prompt):
         "response_format": {"type": "json_object"}
     }
     
-    response = requests.post(OPENAI_API_URL, headers=headers, json=data)
+    response = _ai_session.post(OPENAI_API_URL, headers=headers, json=data, timeout=timeout)
     response.raise_for_status()
     result = response.json()
     content = result['choices'][0]['message']['content']
     return _parse_json_response(content)
 
-def _call_claude_analysis(api_key, prompt):
+def _call_claude_analysis(api_key, prompt, max_tokens=1000, timeout=AI_ANALYSIS_TIMEOUT):
     headers = {
         "x-api-key": api_key,
         "anthropic-version": "2023-06-01",
@@ -204,13 +327,13 @@ def _call_claude_analysis(api_key, prompt):
     }
     data = {
         "model": os.environ.get('CLAUDE_MODEL', 'claude-3-5-sonnet-20240620'),
-        "max_tokens": 1000,
+        "max_tokens": max_tokens,
         "messages": [
             {"role": "user", "content": prompt + "\n\nOutput JSON only."}
         ]
     }
     
-    response = requests.post(CLAUDE_API_URL, headers=headers, json=data)
+    response = _ai_session.post(CLAUDE_API_URL, headers=headers, json=data, timeout=timeout)
     response.raise_for_status()
     result = response.json()
     content = result['content'][0]['text']
@@ -309,7 +432,7 @@ def call_perplexity(prompt, api_key):
         "temperature": 0.7
     }
     
-    response = requests.post(PERPLEXITY_API_URL, headers=headers, json=payload, timeout=60)
+    response = _ai_session.post(PERPLEXITY_API_URL, headers=headers, json=payload, timeout=60)
     response.raise_for_status()
     
     result = response.json()
@@ -339,7 +462,7 @@ def call_openai(prompt, api_key):
         "temperature": 0.7
     }
     
-    response = requests.post(OPENAI_API_URL, headers=headers, json=payload, timeout=60)
+    response = _ai_session.post(OPENAI_API_URL, headers=headers, json=payload, timeout=60)
     response.raise_for_status()
     
     result = response.json()
@@ -366,7 +489,7 @@ def call_claude(prompt, api_key):
         ]
     }
     
-    response = requests.post(CLAUDE_API_URL, headers=headers, json=payload, timeout=60)
+    response = _ai_session.post(CLAUDE_API_URL, headers=headers, json=payload, timeout=60)
     response.raise_for_status()
     
     result = response.json()
@@ -407,6 +530,12 @@ def parse_ai_response(content):
     return questions
 
 
+def _questions_cache_key(job_description, job_title, num_questions, question_types, ai_provider):
+    """Build a cache key from the JD content hash and generation settings (API key excluded)"""
+    digest = hashlib.blake2b(f"{job_title}\0{job_description}".encode('utf-8'), digest_size=16).hexdigest()
+    return f"{ai_provider}:{num_questions}:{question_types}:{digest}"
+
+
 def generate_interview_questions(job_description, job_title, num_questions=10, question_types='mixed', ai_provider=None, custom_api_key=''):
     """Generate interview questions using the specified AI provider"""
     
@@ -422,6 +551,13 @@ def generate_interview_questions(job_description, job_title, num_questions=10, q
             print(f"No API key available for {ai_provider}")
             return generate_questions_fallback(job_description, job_title, num_questions, question_types)
         
+        # Reuse questions previously generated for the same JD and settings
+        cache_key = _questions_cache_key(job_description, job_title, num_questions, question_types, ai_provider)
+        cached_questions = cache_service.get_questions(cache_key)
+        if cached_questions:
+            print(f"Question cache hit: {cache_key}")
+            return cached_questions
+        
         # Build the prompt
         prompt = build_prompt(job_description, job_title, num_questions, question_types)
         
@@ -435,8 +571,11 @@ def generate_interview_questions(job_description, job_title, num_questions=10, q
         else:  # default to perplexity
             content = call_perplexity(prompt, api_key)
         
-        # Parse and return questions
-        return parse_ai_response(content)
+        # Parse, cache and return questions (fallback questions are never cached)
+        questions = parse_ai_response(content)
+        if questions:
+            cache_service.set_questions(cache_key, questions)
+        return questions
         
     except json.JSONDecodeError as e:
         print(f"Error parsing AI response: {str(e)}")
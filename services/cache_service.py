@@ -9,9 +9,18 @@ Setup:
 import os
 import json
 import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from functools import wraps
 
+# orjson is optional; it speeds up (de)serializing cached payloads stored in Redis
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Try to import upstash-redis, fall back to in-memory cache if not available
 try:
     from upstash_redis import Redis
@@ -20,12 +29,33 @@ except ImportError:
     UPSTASH_AVAILABLE = False
     print("upstash-redis not installed. Using in-memory cache fallback.")
 
+# Entry cap for the in-memory fallback; least recently used entries are evicted
+# beyond it, so cached texts and parse results cannot grow without bound
+MEMORY_CACHE_MAX_ENTRIES = int(os.getenv('MEMORY_CACHE_MAX_ENTRIES', '1000'))
+
+
+def _json_dumps(value) -> str:
+    """Serialize a cache value to a JSON string (orjson when available)"""
+    if HAS_ORJSON:
+        try:
+            return orjson.dumps(value).decode('utf-8')
+        except TypeError:
+            pass  # e.g. non-string dict keys; the stdlib handles these
+    return json.dumps(value)
+
+
+def _json_loads(value: str):
+    """Parse a cached JSON string; orjson's decode error subclasses json.JSONDecodeError"""
+    if HAS_ORJSON:
+        return orjson.loads(value)
+    return json.loads(value)
+
 
 class CacheService:
     """
     Hybrid cache service that uses:
     - Upstash Redis when available (production/Vercel)
-    - In-memory dict fallback for local development
+    - In-memory LRU fallback for local development
     """
     
     # Default TTL values (in seconds)
@@ -36,8 +66,10 @@ class CacheService:
     
     def __init__(self):
         self.redis = None
-        self.memory_cache = {}  # Fallback in-memory cache
+        self.memory_cache = OrderedDict()  # Fallback in-memory cache, least recently used first
         self.memory_timestamps = {}  # Track expiry for memory cache
+        self.memory_lock = threading.RLock()  # Guards the memory cache (and makes set_if_absent atomic)
+        self._next_memory_sweep = 0
         
         # Initialize Upstash Redis if credentials are available
         redis_url = os.getenv('UPSTASH_REDIS_REST_URL')
@@ -77,20 +109,22 @@ class CacheService:
                     # Upstash returns the value directly, try to parse as JSON
                     if isinstance(value, str):
                         try:
-                            return json.loads(value)
+                            return _json_loads(value)
                         except json.JSONDecodeError:
                             return value  # Return as-is if not valid JSON
                     return value
             else:
                 # Memory cache with TTL check
-                if key in self.memory_cache:
-                    expiry = self.memory_timestamps.get(key, 0)
-                    if expiry == 0 or datetime.now().timestamp() < expiry:
-                        return self.memory_cache[key]
-                    else:
-                        # Expired
-                        del self.memory_cache[key]
-                        del self.memory_timestamps[key]
+                with self.memory_lock:
+                    if key in self.memory_cache:
+                        expiry = self.memory_timestamps.get(key, 0)
+                        if expiry == 0 or datetime.now().timestamp() < expiry:
+                            self.memory_cache.move_to_end(key)
+                            return self.memory_cache[key]
+                        else:
+                            # Expired
+                            del self.memory_cache[key]
+                            del self.memory_timestamps[key]
         except Exception as e:
             print(f"Cache get error: {e}")
         return None
@@ -99,31 +133,68 @@ class CacheService:
         """Set value in cache with optional TTL"""
         try:
             if self.redis:
-                json_value = json.dumps(value) if not isinstance(value, str) else value
+                json_value = _json_dumps(value) if not isinstance(value, str) else value
                 if ttl:
                     self.redis.setex(key, ttl, json_value)
                 else:
                     self.redis.set(key, json_value)
             else:
-                # Memory cache
-                self.memory_cache[key] = value
-                if ttl:
-                    self.memory_timestamps[key] = datetime.now().timestamp() + ttl
-                else:
-                    self.memory_timestamps[key] = 0  # No expiry
+                self._memory_set(key, value, ttl)
             return True
         except Exception as e:
             print(f"Cache set error: {e}")
             return False
     
+    def set_if_absent(self, key: str, value, ttl: int = None) -> bool:
+        """
+        Atomically set key only if it does not exist yet (Redis SET NX).
+        Returns True if this call set it. Fails open (True) if the cache errors,
+        so callers never drop work because the cache is unavailable.
+        """
+        try:
+            if self.redis:
+                json_value = _json_dumps(value) if not isinstance(value, str) else value
+                return bool(self.redis.set(key, json_value, ex=ttl, nx=True))
+            
+            with self.memory_lock:
+                if self.get(key) is not None:  # get() also drops an expired entry
+                    return False
+                self._memory_set(key, value, ttl)
+                return True
+        except Exception as e:
+            print(f"Cache set_if_absent error: {e}")
+            return True
+    
+    def _memory_set(self, key: str, value, ttl: int = None):
+        """
+        Store a memory cache entry. Expired entries are swept at most once per
+        TTL_SHORT, then the least recently used are evicted past MEMORY_CACHE_MAX_ENTRIES.
+        """
+        now = datetime.now().timestamp()
+        with self.memory_lock:
+            if now >= self._next_memory_sweep:
+                expired = [k for k, expiry in self.memory_timestamps.items() if expiry and expiry <= now]
+                for k in expired:
+                    self.memory_cache.pop(k, None)
+                    del self.memory_timestamps[k]
+                self._next_memory_sweep = now + self.TTL_SHORT
+            
+            self.memory_cache[key] = value
+            self.memory_cache.move_to_end(key)
+            self.memory_timestamps[key] = now + ttl if ttl else 0  # 0 = no expiry
+            while len(self.memory_cache) > MEMORY_CACHE_MAX_ENTRIES:
+                evicted, _ = self.memory_cache.popitem(last=False)
+                self.memory_timestamps.pop(evicted, None)
+    
     def delete(self, key: str):
         """Delete a key from cache"""
         try:
             if self.redis:
                 self.redis.delete(key)
             else:
-                self.memory_cache.pop(key, None)
-                self.memory_timestamps.pop(key, None)
+                with self.memory_lock:
+                    self.memory_cache.pop(key, None)
+                    self.memory_timestamps.pop(key, None)
             return True
         except Exception as e:
             print(f"Cache delete error: {e}")
@@ -138,15 +209,38 @@ class CacheService:
                 pass
             else:
                 # Memory cache - find and delete matching keys
-                keys_to_delete = [k for k in self.memory_cache.keys() if k.startswith(pattern.replace('*', ''))]
-                for key in keys_to_delete:
-                    del self.memory_cache[key]
-                    self.memory_timestamps.pop(key, None)
+                with self.memory_lock:
+                    keys_to_delete = [k for k in self.memory_cache.keys() if k.startswith(pattern.replace('*', ''))]
+                    for key in keys_to_delete:
+                        del self.memory_cache[key]
+                        self.memory_timestamps.pop(key, None)
             return True
         except Exception as e:
             print(f"Cache delete pattern error: {e}")
             return False
     
+    def enqueue(self, queue: str, item) -> bool:
+        """Push an item onto a Redis list used as a work queue (False without Redis)"""
+        if not self.redis:
+            return False
+        try:
+            self.redis.lpush(queue, _json_dumps(item))
+            return True
+        except Exception as e:
+            print(f"Cache enqueue error: {e}")
+            return False
+    
+    def dequeue(self, queue: str):
+        """Pop the oldest item from a Redis work queue, or None if empty/unavailable"""
+        if not self.redis:
+            return None
+        try:
+            value = self.redis.rpop(queue)
+            return _json_loads(value) if isinstance(value, str) else value
+        except Exception as e:
+            print(f"Cache dequeue error: {e}")
+            return None
+    
     def invalidate_jobs(self):
         """Invalidate all job-related cache"""
         self.delete('jobs:all')
@@ -204,6 +298,68 @@ class CacheService:
         """Cache analytics data"""
         return self.set('analytics:data', data, self.TTL_MEDIUM)
     
+    def get_extracted_text(self, content_hash: str):
+        """Get cached extracted text for a file content hash"""
+        entry = self.get(f'text:{content_hash}')
+        return entry.get('text') if isinstance(entry, dict) else None
+    
+    def set_extracted_text(self, content_hash: str, text: str):
+        """
+        Cache extracted text by file content hash (content never changes for a hash).
+        Wrapped in a dict: get() JSON-decodes Redis strings, so bare text that is
+        itself valid JSON ("123", "true") would come back as another type.
+        """
+        return self.set(f'text:{content_hash}', {'text': text}, self.TTL_PERMANENT)
+    
+    def get_parsed_resume(self, key: str):
+        """Get cached parse result for a resume (a fresh dict, since scoring updates it)"""
+        info = self.get(f'resume:{key}')
+        return dict(info) if isinstance(info, dict) else None
+    
+    def set_parsed_resume(self, key: str, info):
+        """Cache a resume parse result by content hash + filename"""
+        return self.set(f'resume:{key}', info, self.TTL_PERMANENT)
+    
+    def get_rank_results(self, key: str):
+        """Get cached /api/rank results (upload key -> result) for a job description + resume set"""
+        return self.get(f'rank:{key}')
+    
+    def set_rank_results(self, key: str, results):
+        """Cache /api/rank results for a job description + resume set"""
+        return self.set(f'rank:{key}', results, self.TTL_LONG)
+    
+    def get_questions(self, key: str):
+        """Get cached AI-generated interview questions"""
+        return self.get(f'questions:{key}')
+    
+    def set_questions(self, key: str, questions):
+        """Cache AI-generated interview questions"""
+        return self.set(f'questions:{key}', questions, self.TTL_PERMANENT)
+    
+    def get_question_task(self, task_id: str):
+        """Get state of a background question-generation task"""
+        return self.get(f'task:questions:{task_id}')
+    
+    def set_question_task(self, task_id: str, task):
+        """Store state of a background question-generation task"""
+        return self.set(f'task:questions:{task_id}', task, self.TTL_LONG)
+    
+    def claim_application(self, key: str) -> bool:
+        """Claim an incoming application; False if the same one was claimed within the hour"""
+        return self.set_if_absent(f'application:{key}', 'pending', self.TTL_LONG)
+    
+    def get_application_claim(self, key: str):
+        """Candidate ID stored for a claimed application ('pending' until it is saved)"""
+        return self.get(f'application:{key}')
+    
+    def set_application_claim(self, key: str, candidate_id: str):
+        """Record the candidate saved for a claimed application"""
+        return self.set(f'application:{key}', candidate_id, self.TTL_LONG)
+    
+    def release_application_claim(self, key: str):
+        """Drop a claim whose application was never saved, so a retry can go through"""
+        return self.delete(f'application:{key}')
+    
     def get_ai_score(self, candidate_id: str):
         """Get cached AI score for a candidate"""
         return self.get(f'ai:score:{candidate_id}')
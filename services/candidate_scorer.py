@@ -1,9 +1,93 @@
 """
 Candidate Scorer - Score and rank candidates based on job requirements
 """
-from typing import Dict, List
+from functools import lru_cache
+from heapq import nlargest
+from operator import itemgetter
+from typing import Dict, List, NamedTuple, Optional
 import re
 
+# Common skill abbreviations and the spellings they stand for
+SKILL_VARIATIONS = {
+    'js': ('javascript',),
+    'ts': ('typescript',),
+    'py': ('python',),
+    'cpp': ('c++',),
+    'c#': ('csharp', 'c sharp'),
+    'ml': ('machine learning',),
+    'ai': ('artificial intelligence',),
+    'dl': ('deep learning',),
+    'fe': ('frontend', 'front-end'),
+    'be': ('backend', 'back-end'),
+    'fs': ('fullstack', 'full-stack'),
+    'react': ('reactjs', 'react.js'),
+    'node': ('nodejs', 'node.js'),
+    'vue': ('vuejs', 'vue.js')
+}
+
+# Reverse lookup: full spelling -> abbreviations, e.g. 'javascript' -> ('js',)
+SKILL_ABBREVIATIONS = {}
+for _short, _longs in SKILL_VARIATIONS.items():
+    for _long in _longs:
+        SKILL_ABBREVIATIONS[_long] = SKILL_ABBREVIATIONS.get(_long, ()) + (_short,)
+
+# Words of 4+ letters compared by the keyword score, minus filler that appears everywhere
+KEYWORD_RE = re.compile(r'\b\w{4,}\b')
+COMMON_WORDS = frozenset({'will', 'work', 'with', 'have', 'this', 'that', 'from', 'they', 'been', 'were', 'your', 'their'})
+
+REQUIRED_YEARS_PATTERNS = (
+    re.compile(r'(\d+)\+?\s*years?\s+(?:of\s+)?experience'),
+    re.compile(r'minimum\s+of\s+(\d+)\s+years?'),
+    re.compile(r'at\s+least\s+(\d+)\s+years?')
+)
+
+
+class JobProfile(NamedTuple):
+    """Job-description data every candidate for the job is scored against"""
+    lower: str
+    words: frozenset            # whitespace-split words, for whole-word abbreviation checks
+    keywords: frozenset         # KEYWORD_RE words minus COMMON_WORDS
+    required_years: Optional[float]
+
+
+@lru_cache(maxsize=256)
+def prepare_job_description(job_description: str) -> JobProfile:
+    """Derive the JobProfile once per distinct job description (cached)"""
+    job_lower = job_description.lower()
+    
+    required_years = None
+    for pattern in REQUIRED_YEARS_PATTERNS:
+        match = pattern.search(job_lower)
+        if match:
+            required_years = float(match.group(1))
+            break
+    
+    return JobProfile(
+        lower=job_lower,
+        words=frozenset(job_lower.split()),
+        keywords=frozenset(KEYWORD_RE.findall(job_lower)) - COMMON_WORDS,
+        required_years=required_years
+    )
+
+def candidate_resume_text(candidate_info: Dict) -> str:
+    """
+    Resume text for AI analysis: the raw text when available, otherwise a compact
+    plain-text profile built from the parsed fields
+    """
+    if candidate_info.get('raw_text'):
+        return candidate_info['raw_text']
+    
+    education = candidate_info.get('education') or []
+    degrees = ', '.join(e.get('degree', '') if isinstance(e, dict) else str(e) for e in education)
+    return (
+        f"Name: {candidate_info.get('name') or ''}\n"
+        f"Summary: {candidate_info.get('summary') or ''}\n"
+        f"Skills: {', '.join(candidate_info.get('skills') or [])}\n"
+        f"Experience: {candidate_info.get('experience_years') or ''} years\n"
+        f"Education: {degrees}\n"
+        f"Certifications: {', '.join(candidate_info.get('certifications') or [])}"
+    )
+
 class CandidateScorer:
     def __init__(self):
         # Advanced Weighting System - Optimized for Accuracy & Robustness
@@ -45,7 +129,15 @@ class CandidateScorer:
             'top_company_experience': 3,    # Worked at notable companies
         }
     
-    def score_candidate(self, candidate_info: Dict, job_description: str, job_title: str, ai_analysis: Dict = None) -> Dict:
+    def precompute_scores(self, candidate_info: Dict, job_description: str) -> Dict:
+        """
+        Component scores that do not depend on the AI analysis, so callers can work them
+        out while the AI call is in flight and pass them to score_candidate(precomputed=...)
+        """
+        return {'keywords': self._score_keywords(candidate_info.get('raw_text', ''), job_description)}
+    
+    def score_candidate(self, candidate_info: Dict, job_description: str, job_title: str, ai_analysis: Dict = None,
+                        precomputed: Dict = None) -> Dict:
         """Score a candidate against job requirements with advanced AI metrics"""
         
         # If AI analysis is not provided, try to generate it on the fly
@@ -53,7 +145,7 @@ class CandidateScorer:
             try:
                 from services.ai_service import analyze_candidate_with_ai
                 ai_analysis = analyze_candidate_with_ai(
-                    candidate_info.get('raw_text', ''), 
+                    candidate_resume_text(candidate_info), 
                     job_description
                 )
             except Exception as e:
@@ -119,7 +211,8 @@ class CandidateScorer:
             'project_complexity': project_complexity_score,
             'communication': communication_score,
             'culture_fit': culture_score,
-            'keywords': self._score_keywords(candidate_info.get('raw_text', ''), job_description)
+            'keywords': precomputed['keywords'] if precomputed and 'keywords' in precomputed
+                        else self._score_keywords(candidate_info.get('raw_text', ''), job_description)
         }
         
         # --- 8. Weighted Total ---
@@ -265,7 +358,8 @@ class CandidateScorer:
             'file_url': candidate_info.get('file_url', ''),
             'parsing_failed': candidate_info.get('parsing_failed', False),
             'status': candidate_info.get('status', 'applied'), # Default to 'applied' for Kanban
-            'ai_analysis': ai_analysis # Include full AI analysis for frontend
+            'ai_analysis': ai_analysis, # Include full AI analysis for frontend
+            'ai_scored': bool(ai_data) # False when AI was unavailable and keywords alone set the score
         }
         
         # Preserve ID if it exists
@@ -287,32 +381,34 @@ class CandidateScorer:
             
         return result
     
+    def score_candidates_batch(self, candidate_infos: List[Dict], job_description: str, job_title: str) -> List[Dict]:
+        """
+        Score several candidates for one job with a single batched AI analysis call.
+        Callers split large pools into batches of ai_service.ANALYSIS_BATCH_SIZE.
+        """
+        from services.ai_service import analyze_candidates_batch
+        
+        analyses = None
+        if len(candidate_infos) > 1:
+            analyses = analyze_candidates_batch([candidate_resume_text(c) for c in candidate_infos], job_description)
+        if analyses is None:
+            # score_candidate falls back to its own per-candidate AI call
+            analyses = [None] * len(candidate_infos)
+        
+        return [
+            self.score_candidate(candidate_info, job_description, job_title, ai_analysis=ai_analysis)
+            for candidate_info, ai_analysis in zip(candidate_infos, analyses)
+        ]
+    
     def _score_skills(self, candidate_skills: List[str], job_description: str) -> float:
         """Score based on skill match (0-100)"""
         if not candidate_skills:
             return 0.0
         
-        job_desc_lower = job_description.lower()
+        job = prepare_job_description(job_description)
+        job_desc_lower = job.lower
         matched_skills = []
         
-        # Common variations mapping
-        variations = {
-            'js': ['javascript'],
-            'ts': ['typescript'],
-            'py': ['python'],
-            'cpp': ['c++'],
-            'c#': ['csharp', 'c sharp'],
-            'ml': ['machine learning'],
-            'ai': ['artificial intelligence'],
-            'dl': ['deep learning'],
-            'fe': ['frontend', 'front-end'],
-            'be': ['backend', 'back-end'],
-            'fs': ['fullstack', 'full-stack'],
-            'react': ['reactjs', 'react.js'],
-            'node': ['nodejs', 'node.js'],
-            'vue': ['vuejs', 'vue.js']
-        }
-        
         for skill in candidate_skills:
             skill_lower = skill.lower()
             
@@ -322,24 +418,15 @@ class CandidateScorer:
                 continue
                 
             # Check variations
-            if skill_lower in variations:
-                found_var = False
-                for var in variations[skill_lower]:
-                    if var in job_desc_lower:
-                        matched_skills.append(skill)
-                        found_var = True
-                        break
-                if found_var:
-                    continue
+            if any(var in job_desc_lower for var in SKILL_VARIATIONS.get(skill_lower, ())):
+                matched_skills.append(skill)
+                continue
             
             # Check if skill is a variation of something in JD
             # e.g. skill="JavaScript", JD="JS"
-            # We iterate over variations map to see if skill is a value
-            for short, longs in variations.items():
-                if skill_lower in longs:
-                    if short in job_desc_lower.split(): # Use split to match whole word "js" not "json"
-                        matched_skills.append(skill)
-                        break
+            # Match whole word "js" not "json"
+            if any(short in job.words for short in SKILL_ABBREVIATIONS.get(skill_lower, ())):
+                matched_skills.append(skill)
 
         if not matched_skills:
             return 0.0
@@ -366,7 +453,7 @@ class CandidateScorer:
             return 50.0  # Neutral score if not specified
         
         # Extract required years from job description
-        required_years = self._extract_required_years(job_description)
+        required_years = prepare_job_description(job_description).required_years
         
         if required_years is None:
             # No specific requirement, score based on general experience
@@ -403,12 +490,13 @@ class CandidateScorer:
         if not education:
             return 50.0  # Neutral score
         
-        job_desc_lower = job_description.lower()
+        job_desc_lower = prepare_job_description(job_description).lower
         
         # Check for degree requirements
-        has_phd = any('phd' in e.get('degree', '').lower() for e in education)
-        has_masters = any('master' in e.get('degree', '').lower() or 'mba' in e.get('degree', '').lower() for e in education)
-        has_bachelors = any('bachelor' in e.get('degree', '').lower() or 'b.' in e.get('degree', '').lower() for e in education)
+        degrees = [e.get('degree', '').lower() for e in education]
+        has_phd = any('phd' in d for d in degrees)
+        has_masters = any('master' in d or 'mba' in d for d in degrees)
+        has_bachelors = any('bachelor' in d or 'b.' in d for d in degrees)
         
         if 'phd' in job_desc_lower or 'doctorate' in job_desc_lower:
             return 100.0 if has_phd else (80.0 if has_masters else 60.0)
@@ -429,23 +517,16 @@ class CandidateScorer:
     
     def _score_keywords(self, resume_text: str, job_description: str) -> float:
         """Score based on keyword match (0-100)"""
-        resume_lower = resume_text.lower()
-        job_lower = job_description.lower()
-        
         # Extract important keywords from job description (nouns/verbs)
-        # Simple approach: look for words that appear in both
-        job_words = set(re.findall(r'\b\w{4,}\b', job_lower))
-        resume_words = set(re.findall(r'\b\w{4,}\b', resume_lower))
-        
-        # Remove common words
-        common_words = {'will', 'work', 'with', 'have', 'this', 'that', 'from', 'they', 'been', 'were', 'your', 'their'}
-        job_words = job_words - common_words
-        resume_words = resume_words - common_words
+        # Simple approach: look for words that appear in both (common words removed)
+        job_words = prepare_job_description(job_description).keywords
         
         if not job_words:
             return 50.0
         
-        matches = job_words.intersection(resume_words)
+        # Intersect straight from the regex iterator: only the (small) overlap is
+        # built as a set, not the resume's whole vocabulary
+        matches = job_words.intersection(KEYWORD_RE.findall(resume_text.lower()))
         match_ratio = len(matches) / len(job_words)
         
         return min(100.0, match_ratio * 150)  # Can get bonus points
@@ -469,21 +550,7 @@ class CandidateScorer:
     
     def _extract_required_years(self, job_description: str) -> float:
         """Extract required years of experience from job description"""
-        patterns = [
-            r'(\d+)\+?\s*years?\s+(?:of\s+)?experience',
-            r'minimum\s+of\s+(\d+)\s+years?',
-            r'at\s+least\s+(\d+)\s+years?'
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, job_description.lower())
-            if matches:
-                try:
-                    return float(matches[0])
-                except:
-                    pass
-        
-        return None
+        return prepare_job_description(job_description).required_years
     
     def _generate_feedback(self, scores: Dict, candidate_info: Dict) -> List[str]:
         """Generate constructive feedback for the candidate"""
@@ -535,9 +602,17 @@ class CandidateScorer:
         else:
             return "F"
     
-    def rank_candidates(self, scored_candidates: List[Dict]) -> List[Dict]:
-        """Rank candidates by total score"""
-        ranked = sorted(scored_candidates, key=lambda x: x['total_score'], reverse=True)
+    def rank_candidates(self, scored_candidates: List[Dict], limit: Optional[int] = None) -> List[Dict]:
+        """Rank candidates by total score, keeping only the top `limit` when given (must be positive)"""
+        if limit is not None and limit < 1:
+            raise ValueError(f"limit must be a positive integer, got {limit}")
+        
+        by_score = itemgetter('total_score')
+        if limit is not None and limit < len(scored_candidates):
+            # Heap selection is O(n log k) and keeps ties in input order, like the full sort
+            ranked = nlargest(limit, scored_candidates, key=by_score)
+        else:
+            ranked = sorted(scored_candidates, key=by_score, reverse=True)
         
         # Add rank numbers
         for i, candidate in enumerate(ranked, 1):
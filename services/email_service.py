@@ -7,6 +7,12 @@ import threading
 from queue import Queue
 from datetime import datetime
 
+# A digest is sent early once this many admin notifications are waiting
+ADMIN_DIGEST_MAX_ITEMS = 25
+
+# Scores above this are sent to the admin immediately instead of via the digest
+HIGH_SCORE_ALERT = 70
+
 
 class EmailService:
     """
@@ -28,6 +34,20 @@ class EmailService:
         self.worker_thread = None
         self.is_running = False
         
+        # Admin notifications for ordinary applications are collected for this many
+        # seconds and sent as one digest (0 = one email per candidate). Serverless
+        # platforms kill the flush timer, so batching is off there by default.
+        is_serverless = os.getenv('VERCEL') or os.getenv('RAILWAY_ENVIRONMENT')
+        default_digest_seconds = 0 if is_serverless else 60
+        try:
+            self.admin_digest_seconds = int(os.getenv('ADMIN_DIGEST_SECONDS', default_digest_seconds))
+        except ValueError:
+            print(f"⚠️ Invalid ADMIN_DIGEST_SECONDS, using {default_digest_seconds}")
+            self.admin_digest_seconds = default_digest_seconds
+        self.admin_digest = []
+        self.admin_digest_lock = threading.Lock()
+        self.admin_digest_timer = None
+        
         # Email stats
         self.stats = {
             'queued': 0,
@@ -45,7 +65,8 @@ class EmailService:
             print("📧 Email worker thread started")
     
     def _process_queue(self):
-        """Process emails from queue in background"""
+        """Process emails from queue in background, reusing one SMTP session while mail is waiting"""
+        server = None
         while self.is_running:
             try:
                 # Wait for email with timeout to allow graceful shutdown
@@ -54,45 +75,85 @@ class EmailService:
                     break
                 
                 to_email, subject, body, is_html = email_task
-                success = self._send_email_sync(to_email, subject, body, is_html)
+                success, server = self._send_on_session(server, to_email, subject, body, is_html)
                 
                 if success:
                     self.stats['sent'] += 1
                 else:
                     self.stats['failed'] += 1
+                
+                # Hang up once the queue is drained; the next burst reconnects
+                if server is not None and self.email_queue.empty():
+                    self._close_smtp(server)
+                    server = None
                     
                 self.email_queue.task_done()
             except Exception as e:
                 # Queue.get timeout - just continue
                 if 'Empty' not in str(type(e)):
                     print(f"Email worker error: {e}")
+        
+        if server is not None:
+            self._close_smtp(server)
     
-    def _send_email_sync(self, to_email, subject, body, is_html=False):
-        """Synchronously send an email (used by background worker)"""
+    def _open_smtp(self):
+        """Connect, upgrade to TLS and log in to the SMTP server"""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=30)
+        server.starttls()
+        server.login(self.sender_email, self.sender_password)
+        return server
+    
+    def _close_smtp(self, server):
+        """Close an SMTP session, ignoring errors from an already-dropped connection"""
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+    
+    def _build_message(self, to_email, subject, body, is_html=False):
+        msg = MIMEMultipart()
+        msg['From'] = formataddr((self.sender_name, self.sender_email))
+        msg['To'] = to_email
+        msg['Subject'] = subject
+
+        msg.attach(MIMEText(body, 'html' if is_html else 'plain'))
+        return msg.as_string()
+    
+    def _send_on_session(self, server, to_email, subject, body, is_html=False):
+        """
+        Send on an open SMTP session (or a new one if server is None).
+        Returns (success, session to reuse or None). A reused session the server
+        has since dropped is retried once on a fresh connection.
+        """
         if not self.enabled:
             print("Email service disabled (credentials not set).")
-            return False
-
+            return False, server
+        
+        reused = server is not None
         try:
-            msg = MIMEMultipart()
-            msg['From'] = formataddr((self.sender_name, self.sender_email))
-            msg['To'] = to_email
-            msg['Subject'] = subject
-
-            msg.attach(MIMEText(body, 'html' if is_html else 'plain'))
-
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.sender_email, self.sender_password)
-            text = msg.as_string()
-            server.sendmail(self.sender_email, to_email, text)
-            server.quit()
+            if server is None:
+                server = self._open_smtp()
+            server.sendmail(self.sender_email, to_email, self._build_message(to_email, subject, body, is_html))
             print(f"✅ Email sent to {to_email}")
-            return True
+            return True, server
         except Exception as e:
+            if server is not None:
+                self._close_smtp(server)
+            if reused:
+                return self._send_on_session(None, to_email, subject, body, is_html)
             print(f"❌ Failed to send email to {to_email}: {e}")
             self.stats['last_error'] = str(e)
-            return False
+            return False, None
+    
+    def _send_email_sync(self, to_email, subject, body, is_html=False):
+        """Synchronously send an email on its own SMTP session"""
+        success, server = self._send_on_session(None, to_email, subject, body, is_html)
+        if server is not None:
+            self._close_smtp(server)
+        return success
     
     def send_email(self, to_email, subject, body, is_html=False, background=True):
         """
@@ -133,11 +194,14 @@ class EmailService:
         return {
             'queue_size': self.email_queue.qsize(),
             'worker_running': self.worker_thread.is_alive() if self.worker_thread else False,
+            'admin_digest_pending': len(self.admin_digest),
             'stats': self.stats
         }
     
     def shutdown(self):
         """Gracefully shutdown the email worker"""
+        # Queue any pending admin digest ahead of the shutdown signal
+        self._flush_admin_digest()
         self.is_running = False
         if self.worker_thread and self.worker_thread.is_alive():
             self.email_queue.put(None)  # Shutdown signal
@@ -256,9 +320,41 @@ class EmailService:
         return self.send_email(candidate_email, subject, body, is_html=True)
 
     def send_admin_notification(self, candidate_data, base_url=None):
+        """Notify the admin of a new candidate: high scores at once, others via the digest"""
         if not self.admin_email:
             return False
-            
+        
+        summary = self._admin_candidate_summary(candidate_data, base_url)
+        if summary['score'] > HIGH_SCORE_ALERT or self.admin_digest_seconds <= 0:
+            return self._send_admin_candidate_email(summary)
+        
+        with self.admin_digest_lock:
+            self.admin_digest.append(summary)
+            flush_now = len(self.admin_digest) >= ADMIN_DIGEST_MAX_ITEMS
+            if not flush_now and self.admin_digest_timer is None:
+                self.admin_digest_timer = threading.Timer(self.admin_digest_seconds, self._flush_admin_digest)
+                self.admin_digest_timer.daemon = True
+                self.admin_digest_timer.start()
+        
+        if flush_now:
+            self._flush_admin_digest()
+        return True
+    
+    def _flush_admin_digest(self):
+        """Send everything collected for the admin digest (called by the timer or when full)"""
+        with self.admin_digest_lock:
+            batch, self.admin_digest = self.admin_digest, []
+            if self.admin_digest_timer is not None:
+                self.admin_digest_timer.cancel()
+                self.admin_digest_timer = None
+        
+        if len(batch) == 1:
+            self._send_admin_candidate_email(batch[0])
+        elif batch:
+            self._send_admin_digest(batch)
+    
+    def _admin_candidate_summary(self, candidate_data, base_url=None):
+        """Pull the fields shown in admin emails out of a score result"""
         score = candidate_data.get('total_score', 0)
         # Handle different key names
         name = candidate_data.get('candidate_name') or candidate_data.get('name') or 'Unknown'
@@ -281,8 +377,22 @@ class EmailService:
                 path = resume_link.lstrip('/')
                 resume_link = f"{base}/{path}"
         
+        return {
+            'name': name,
+            'email': email,
+            'phone': phone,
+            'score': score,
+            'skills': list(candidate_data.get('skills', [])),
+            'resume_link': resume_link
+        }
+    
+    def _send_admin_candidate_email(self, summary):
+        """Send the single-candidate admin notification"""
+        name = summary['name']
+        score = summary['score']
+        
         # High Score Alert Logic
-        if score > 70:
+        if score > HIGH_SCORE_ALERT:
             subject = f"🔥 HIGH SCORE ALERT: {name} ({score}/100)"
             header_color = "#d32f2f" # Red for alert
             header_text = "High Potential Candidate Detected!"
@@ -291,24 +401,56 @@ class EmailService:
             header_color = "#2c3e50" # Standard blue/grey
             header_text = "New Application Received"
         
-        skills_html = "<ul>"
-        for skill in candidate_data.get('skills', []):
-            skills_html += f"<li>{skill}</li>"
-        skills_html += "</ul>"
+        skills_html = "<ul>" + "".join(f"<li>{skill}</li>" for skill in summary['skills']) + "</ul>"
         
         body = f"""
         <html>
         <body>
             <h2 style="color: {header_color};">{header_text}</h2>
             <p><strong>Name:</strong> {name}</p>
-            <p><strong>Email:</strong> {email}</p>
-            <p><strong>Phone:</strong> {phone}</p>
+            <p><strong>Email:</strong> {summary['email']}</p>
+            <p><strong>Phone:</strong> {summary['phone']}</p>
             <p><strong>Total Score:</strong> <span style="font-size: 1.2em; font-weight: bold; color: {header_color};">{score}/100</span></p>
             
             <h3>Skills Detected:</h3>
             {skills_html}
             
-            <p><a href="{resume_link}">View Resume</a></p>
+            <p><a href="{summary['resume_link']}">View Resume</a></p>
+        </body>
+        </html>
+        """
+        return self.send_email(self.admin_email, subject, body, is_html=True)
+    
+    def _send_admin_digest(self, batch):
+        """Send one admin email listing several new candidates, in arrival order"""
+        subject = f"{len(batch)} New Candidates (top score: {max(c['score'] for c in batch)}/100)"
+        rows = "".join(
+            f"""
+                <tr>
+                    <td style="padding: 6px; border-bottom: 1px solid #ddd;">{c['name']}</td>
+                    <td style="padding: 6px; border-bottom: 1px solid #ddd;">{c['email']}</td>
+                    <td style="padding: 6px; border-bottom: 1px solid #ddd;">{c['phone']}</td>
+                    <td style="padding: 6px; border-bottom: 1px solid #ddd;"><strong>{c['score']}/100</strong></td>
+                    <td style="padding: 6px; border-bottom: 1px solid #ddd;">{', '.join(c['skills'][:8])}</td>
+                    <td style="padding: 6px; border-bottom: 1px solid #ddd;"><a href="{c['resume_link']}">View Resume</a></td>
+                </tr>"""
+            for c in batch
+        )
+        
+        body = f"""
+        <html>
+        <body>
+            <h2 style="color: #2c3e50;">{len(batch)} New Applications Received</h2>
+            <table style="border-collapse: collapse; width: 100%;">
+                <tr style="text-align: left; background-color: #f8f9fa;">
+                    <th style="padding: 6px;">Name</th>
+                    <th style="padding: 6px;">Email</th>
+                    <th style="padding: 6px;">Phone</th>
+                    <th style="padding: 6px;">Score</th>
+                    <th style="padding: 6px;">Skills</th>
+                    <th style="padding: 6px;">Resume</th>
+                </tr>{rows}
+            </table>
         </body>
         </html>
         """
@@ -1,8 +1,17 @@
 import os
+import io
+import hashlib
 from PyPDF2 import PdfReader
 from docx import Document
 from bs4 import BeautifulSoup
 
+# PyMuPDF is optional; its C core extracts PDF text much faster than PyPDF2
+try:
+    import fitz
+    HAS_PYMUPDF = True
+except ImportError:
+    HAS_PYMUPDF = False
+
 
 def extract_text_from_file(filepath):
     """Extract text content from PDF, DOCX, TXT, or HTML files"""
@@ -32,46 +41,96 @@ def extract_text_from_file(filepath):
         return ""
 
 
+def extract_text_from_bytes(data, filename):
+    """Extract text from an upload already held in memory, using the filename's extension"""
+    
+    _, ext = os.path.splitext(filename)
+    ext = ext.lower()
+    
+    try:
+        # Check if content is actually HTML regardless of extension
+        if _looks_like_html(data[:1024].strip()):
+            return _html_to_text(data.decode('utf-8', errors='ignore'))
+        
+        if ext == '.pdf':
+            return extract_from_pdf(data)
+        elif ext == '.docx':
+            return extract_from_docx(io.BytesIO(data))
+        elif ext == '.html' or ext == '.htm':
+            return _html_to_text(data.decode('utf-8', errors='ignore'))
+        else:
+            # TXT, or try as text if unknown
+            return _decode_text(data)
+    except Exception as e:
+        print(f"Error extracting text from {filename}: {str(e)}")
+        return ""
+
+
+def file_fingerprint(filepath, chunk_size=1 << 20):
+    """Return a BLAKE2b content hash of a file, used as a cache key for extracted text"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
 def is_html_file(filepath):
     """Check if file content looks like HTML"""
     try:
         with open(filepath, 'rb') as f:
-            start = f.read(1024).strip()
-            # Check for common HTML markers
-            if b'<!DOCTYPE html' in start or b'<html' in start or b'<body' in start:
-                return True
+            return _looks_like_html(f.read(1024).strip())
     except:
         pass
     return False
 
 
+def _looks_like_html(start):
+    """Check the first bytes of a file for common HTML markers"""
+    return b'<!DOCTYPE html' in start or b'<html' in start or b'<body' in start
+
+
 def extract_from_html(filepath):
     """Extract text from HTML file"""
     try:
         with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            soup = BeautifulSoup(f, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-                
-            text = soup.get_text()
-            
-            # Break into lines and remove leading/trailing space on each
-            lines = (line.strip() for line in text.splitlines())
-            # Break multi-headlines into a line each
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            # Drop blank lines
-            text = '\n'.join(chunk for chunk in chunks if chunk)
-            
-            return text
+            return _html_to_text(f)
     except Exception as e:
         print(f"Error reading HTML file: {e}")
         return ""
 
 
+def _html_to_text(markup):
+    """Strip tags, scripts and blank lines from HTML markup (string or open file)"""
+    soup = BeautifulSoup(markup, 'html.parser')
+    
+    # Remove script and style elements
+    for script in soup(["script", "style"]):
+        script.decompose()
+        
+    text = soup.get_text()
+    
+    # Break into lines and remove leading/trailing space on each
+    lines = (line.strip() for line in text.splitlines())
+    # Break multi-headlines into a line each
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    # Drop blank lines
+    return '\n'.join(chunk for chunk in chunks if chunk)
+
+
 def extract_from_pdf(filepath):
-    """Extract text from PDF file"""
+    """Extract text from PDF file (path, bytes or binary file object)"""
+    if HAS_PYMUPDF:
+        try:
+            return _extract_pdf_pymupdf(filepath)
+        except Exception as e:
+            print(f"PyMuPDF failed, falling back to PyPDF2: {e}")
+            if hasattr(filepath, 'seek'):
+                filepath.seek(0)
+    
+    if isinstance(filepath, (bytes, bytearray)):
+        filepath = io.BytesIO(filepath)
+    
     text = ""
     try:
         reader = PdfReader(filepath)
@@ -91,8 +150,20 @@ def extract_from_pdf(filepath):
     return text.strip()
 
 
+def _extract_pdf_pymupdf(source):
+    """Extract PDF text with PyMuPDF; paths are opened directly and bytes are read in place"""
+    if isinstance(source, str):
+        doc = fitz.open(source)
+    elif isinstance(source, (bytes, bytearray)):
+        doc = fitz.open(stream=source, filetype='pdf')
+    else:
+        doc = fitz.open(stream=source.read(), filetype='pdf')
+    with doc:
+        return '\n'.join(page.get_text('text') for page in doc).strip()
+
+
 def extract_from_docx(filepath):
-    """Extract text from DOCX file"""
+    """Extract text from DOCX file (path or binary file object)"""
     try:
         doc = Document(filepath)
         text = ""
@@ -128,3 +199,15 @@ def extract_from_txt(filepath):
             return ""
             
     return ""
+
+
+def _decode_text(data):
+    """Decode in-memory TXT content with the same encoding fallback as extract_from_txt"""
+    for encoding in ('utf-8', 'latin-1', 'cp1252', 'ascii'):
+        try:
+            text = data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+        # Match the newline translation of text-mode open()
+        return text.replace('\r\n', '\n').replace('\r', '\n').strip()
+    return ""
@@ -4,7 +4,7 @@ Resume Parser - Extract information from candidate resumes
 import re
 from typing import Dict, List, Optional
 from datetime import datetime
-from .file_processor import extract_text_from_file
+from .file_processor import extract_text_from_file, extract_text_from_bytes
 
 class ResumeParser:
     def __init__(self):
@@ -39,10 +39,13 @@ class ResumeParser:
             ]
         }
 
-    def parse_resume(self, file_path: str, filename: str) -> Dict:
-        """Parse resume and extract key information"""
+    def parse_resume(self, file_path: str, filename: str, data: Optional[bytes] = None) -> Dict:
+        """Parse resume and extract key information (from data if given, else from file_path)"""
         try:
-            text = extract_text_from_file(file_path)
+            if data is not None:
+                text = extract_text_from_bytes(data, filename)
+            else:
+                text = extract_text_from_file(file_path)
         except Exception as e:
             print(f"Error extracting text: {e}")
             text = ""
@@ -265,3 +268,18 @@ class ResumeParser:
                 
         # Fallback: First 200 chars
         return text[:200].strip() + "..."
+
+
+# Parser for parse_resume_file, created on first use in each process
+_file_parser = None
+
+
+def parse_resume_file(filepath, filename, data=None):
+    """
+    Parse a single resume with a module-level parser. Process-pool workers import
+    this module on its own, without loading the Flask app and its services.
+    """
+    global _file_parser
+    if _file_parser is None:
+        _file_parser = ResumeParser()
+    return _file_parser.parse_resume(filepath, filename, data)
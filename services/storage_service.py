@@ -12,6 +12,21 @@ try:
 except ImportError:
     HAS_POSTGRES = False
 
+# orjson is optional; it speeds up decoding the JSON columns of large candidate listings
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _json_loads(value):
+    """Parse a stored JSON column (orjson when available)"""
+    if HAS_ORJSON:
+        return orjson.loads(value)
+    return json.loads(value)
+
+
 DATA_DIR = 'data'
 DB_FILE = os.path.join(DATA_DIR, 'candidates.db')
 JSON_FILE = os.path.join(DATA_DIR, 'candidates.json')
@@ -46,25 +61,30 @@ class StorageService:
             self._migrate_from_json_if_needed()
     
     def _ensure_data_dir(self):
-        if not os.path.exists(DATA_DIR):
-            os.makedirs(DATA_DIR)
+        os.makedirs(DATA_DIR, exist_ok=True)
 
     def _get_connection(self):
         if self.is_postgres:
             return psycopg2.connect(self.db_url)
         else:
-            # Add timeout for concurrent access (wait up to 30 seconds for lock)
+            # Add timeout for concurrent access (wait up to 30 seconds for lock);
+            # this is SQLite's busy timeout, so no busy_timeout PRAGMA is needed
             conn = sqlite3.connect(DB_FILE, timeout=30.0)
             conn.row_factory = sqlite3.Row
-            # Enable WAL mode for better concurrent read/write performance
-            conn.execute('PRAGMA journal_mode=WAL')
-            conn.execute('PRAGMA busy_timeout=30000')  # 30 second timeout
+            # WAL itself is enabled once in _init_db (it persists in the file). In WAL
+            # mode NORMAL syncs at checkpoints instead of fsyncing every commit, and
+            # cannot corrupt the database; it is a per-connection setting.
+            conn.execute('PRAGMA synchronous=NORMAL')
             return conn
 
     def _init_db(self):
         conn = self._get_connection()
         cursor = conn.cursor()
         
+        if not self.is_postgres:
+            # Enable WAL mode for better concurrent read/write performance
+            conn.execute('PRAGMA journal_mode=WAL')
+        
         try:
             # Create jobs table
             cursor.execute('''
@@ -119,6 +139,16 @@ class StorageService:
                     if not cursor.fetchone():
                         cursor.execute("ALTER TABLE candidates ADD COLUMN tags TEXT")
                     
+                    # Add parsed_resume column (resume parse kept for manual reprocessing)
+                    cursor.execute("SELECT column_name FROM information_schema.columns WHERE table_name='candidates' AND column_name='parsed_resume'")
+                    if not cursor.fetchone():
+                        cursor.execute("ALTER TABLE candidates ADD COLUMN parsed_resume TEXT")
+                    
+                    # Add requeued_at column (automatic retry of abandoned pending applications)
+                    cursor.execute("SELECT column_name FROM information_schema.columns WHERE table_name='candidates' AND column_name='requeued_at'")
+                    if not cursor.fetchone():
+                        cursor.execute("ALTER TABLE candidates ADD COLUMN requeued_at TEXT")
+                    
                     # Check for edit_url in jobs
                     cursor.execute("SELECT column_name FROM information_schema.columns WHERE table_name='jobs' AND column_name='edit_url'")
                     if not cursor.fetchone():
@@ -135,6 +165,10 @@ class StorageService:
                         cursor.execute("ALTER TABLE candidates ADD COLUMN notes TEXT")
                     if 'tags' not in columns:
                         cursor.execute("ALTER TABLE candidates ADD COLUMN tags TEXT")
+                    if 'parsed_resume' not in columns:
+                        cursor.execute("ALTER TABLE candidates ADD COLUMN parsed_resume TEXT")
+                    if 'requeued_at' not in columns:
+                        cursor.execute("ALTER TABLE candidates ADD COLUMN requeued_at TEXT")
                         
                     # Check for edit_url in jobs
                     cursor.execute("PRAGMA table_info(jobs)")
@@ -270,6 +304,24 @@ class StorageService:
         finally:
             conn.close()
 
+    def update_job_description(self, job_id: str, description: str) -> bool:
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            if self.is_postgres:
+                cursor.execute("UPDATE jobs SET description = %s WHERE id = %s", (description, job_id))
+            else:
+                cursor.execute("UPDATE jobs SET description = ? WHERE id = ?", (description, job_id))
+            
+            rows_affected = cursor.rowcount
+            conn.commit()
+            return rows_affected > 0
+        except Exception as e:
+            print(f"Error updating job description: {e}")
+            return False
+        finally:
+            conn.close()
+
     def delete_job(self, job_id: str) -> bool:
         conn = self._get_connection()
         cursor = conn.cursor()
@@ -305,7 +357,7 @@ class StorageService:
             job = dict(row)
             if job.get('raw_data'):
                 try:
-                    raw = json.loads(job['raw_data'])
+                    raw = _json_loads(job['raw_data'])
                     # Merge raw data, but prioritize column values (e.g. status)
                     for k, v in raw.items():
                         if k not in job:
@@ -332,7 +384,7 @@ class StorageService:
             job = dict(row)
             if job.get('raw_data'):
                 try:
-                    raw = json.loads(job['raw_data'])
+                    raw = _json_loads(job['raw_data'])
                     # Merge raw data, but prioritize column values
                     for k, v in raw.items():
                         if k not in job:
@@ -342,6 +394,56 @@ class StorageService:
         return None
 
     def get_all_candidates(self, job_id: str = None) -> List[Dict]:
+        if job_id:
+            where = 'c.job_id = %s' if self.is_postgres else 'c.job_id = ?'
+            return self._query_candidates(where, (job_id,))
+        return self._query_candidates()
+    
+    def get_candidate(self, candidate_id: str) -> Optional[Dict]:
+        """Fetch one candidate by primary key (no full-table scan)"""
+        where = 'c.id = %s' if self.is_postgres else 'c.id = ?'
+        candidates = self._query_candidates(where, (candidate_id,))
+        return candidates[0] if candidates else None
+    
+    def get_stale_pending_candidates(self, received_before: str) -> List[Dict]:
+        """Candidates still 'pending' that were received before an ISO timestamp and never requeued"""
+        if self.is_postgres:
+            where = 'c.timestamp < %s AND c.requeued_at IS NULL AND c.raw_data LIKE %s'
+        else:
+            where = 'c.timestamp < ? AND c.requeued_at IS NULL AND c.raw_data LIKE ?'
+        # Status lives in raw_data; LIKE narrows the scan, the exact check is below
+        candidates = self._query_candidates(where, (received_before, '%"status": "pending"%'))
+        return [c for c in candidates if c.get('status') == 'pending']
+    
+    def mark_requeued(self, candidate_id: str) -> bool:
+        """Mark a pending candidate as requeued; False if another process already did (or on error)"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            now = datetime.now().isoformat()
+            if self.is_postgres:
+                cursor.execute("UPDATE candidates SET requeued_at = %s WHERE id = %s AND requeued_at IS NULL", (now, candidate_id))
+            else:
+                cursor.execute("UPDATE candidates SET requeued_at = ? WHERE id = ? AND requeued_at IS NULL", (now, candidate_id))
+            
+            rows_affected = cursor.rowcount
+            conn.commit()
+            return rows_affected > 0
+        except Exception as e:
+            print(f"Error marking candidate requeued: {e}")
+            return False
+        finally:
+            conn.close()
+    
+    def get_candidates_by_ids(self, candidate_ids: List[str]) -> List[Dict]:
+        """Fetch several candidates by primary key in one query"""
+        if not candidate_ids:
+            return []
+        placeholder = '%s' if self.is_postgres else '?'
+        where = f"c.id IN ({', '.join([placeholder] * len(candidate_ids))})"
+        return self._query_candidates(where, tuple(candidate_ids))
+    
+    def _query_candidates(self, where: str = None, params: tuple = ()) -> List[Dict]:
         conn = self._get_connection()
         
         if self.is_postgres:
@@ -355,87 +457,92 @@ class StorageService:
             FROM candidates c 
             LEFT JOIN jobs j ON c.job_id = j.id
         '''
-        params = []
         
-        if job_id:
-            query += ' WHERE c.job_id = %s' if self.is_postgres else ' WHERE c.job_id = ?'
-            params.append(job_id)
+        if where:
+            query += f' WHERE {where}'
             
         query += ' ORDER BY c.timestamp DESC'
         
-        cursor.execute(query, tuple(params))
+        cursor.execute(query, params)
         rows = cursor.fetchall()
+        conn.close()
         
-        candidates = []
-        for row in rows:
-            cand = dict(row)
-            if cand.get('skills'):
-                try: cand['skills'] = json.loads(cand['skills'])
-                except: cand['skills'] = {}
-            if cand.get('answers'):
-                try: cand['answers'] = json.loads(cand['answers'])
-                except: cand['answers'] = {}
-            if cand.get('raw_data'):
-                try: 
-                    cand['raw_data'] = json.loads(cand['raw_data'])
-                    raw = cand['raw_data']
+        return [self._candidate_from_row(row) for row in rows]
+    
+    def _candidate_from_row(self, row) -> Dict:
+        """Decode JSON columns and promote raw_data fields on a candidates row"""
+        cand = dict(row)
+        if cand.get('skills'):
+            try: cand['skills'] = _json_loads(cand['skills'])
+            except: cand['skills'] = {}
+        if cand.get('answers'):
+            try: cand['answers'] = _json_loads(cand['answers'])
+            except: cand['answers'] = {}
+        if cand.get('raw_data'):
+            try: 
+                cand['raw_data'] = _json_loads(cand['raw_data'])
+                raw = cand['raw_data']
+                
+                # Promote fields from raw_data if missing in columns
+                if not cand.get('name') and raw.get('candidate_name'):
+                    cand['name'] = raw['candidate_name']
+                if not cand.get('email') and raw.get('candidate_email'):
+                    cand['email'] = raw['candidate_email']
+                if not cand.get('phone') and raw.get('candidate_phone'):
+                    cand['phone'] = raw['candidate_phone']
+                if not cand.get('score') and raw.get('total_score'):
+                    cand['total_score'] = raw['total_score']
+                elif cand.get('score'): # Map score col to total_score key
+                    cand['total_score'] = cand['score']
                     
-                    # Promote fields from raw_data if missing in columns
-                    if not cand.get('name') and raw.get('candidate_name'):
-                        cand['name'] = raw['candidate_name']
-                    if not cand.get('email') and raw.get('candidate_email'):
-                        cand['email'] = raw['candidate_email']
-                    if not cand.get('phone') and raw.get('candidate_phone'):
-                        cand['phone'] = raw['candidate_phone']
-                    if not cand.get('score') and raw.get('total_score'):
-                        cand['total_score'] = raw['total_score']
-                    elif cand.get('score'): # Map score col to total_score key
-                        cand['total_score'] = cand['score']
-                        
-                    # Promote status from raw_data if not present
-                    if 'status' not in cand and 'status' in raw:
-                        cand['status'] = raw['status']
+                # Promote status from raw_data if not present
+                if 'status' not in cand and 'status' in raw:
+                    cand['status'] = raw['status']
 
-                    # Promote complex objects (breakdown, ai_analysis)
-                    if 'breakdown' not in cand and 'breakdown' in raw:
-                        cand['breakdown'] = raw['breakdown']
-                    if 'ai_analysis' not in cand and 'ai_analysis' in raw:
-                        cand['ai_analysis'] = raw['ai_analysis']
-                        
-                    # Ensure candidate_name is available as alias
-                    cand['candidate_name'] = cand.get('name')
-                    cand['candidate_email'] = cand.get('email')
-                    cand['candidate_phone'] = cand.get('phone')
+                # Promote complex objects (breakdown, ai_analysis)
+                if 'breakdown' not in cand and 'breakdown' in raw:
+                    cand['breakdown'] = raw['breakdown']
+                if 'ai_analysis' not in cand and 'ai_analysis' in raw:
+                    cand['ai_analysis'] = raw['ai_analysis']
                     
-                except Exception as e: 
-                    print(f"Error parsing raw_data: {e}")
-                    cand['raw_data'] = {}
-            
-            # Default status if missing
-            if 'status' not in cand:
-                cand['status'] = 'applied'
-            
-            # Ensure total_score is present
-            if 'total_score' not in cand and cand.get('score'):
-                cand['total_score'] = cand['score']
-            
-            # Parse tags JSON if present
-            if cand.get('tags'):
-                try:
-                    cand['tags'] = json.loads(cand['tags'])
-                except:
-                    cand['tags'] = []
-            else:
-                cand['tags'] = []
-            
-            # Notes is already a string, just ensure it exists
-            if not cand.get('notes'):
-                cand['notes'] = ''
+                # Ensure candidate_name is available as alias
+                cand['candidate_name'] = cand.get('name')
+                cand['candidate_email'] = cand.get('email')
+                cand['candidate_phone'] = cand.get('phone')
                 
-            candidates.append(cand)
+            except Exception as e: 
+                print(f"Error parsing raw_data: {e}")
+                cand['raw_data'] = {}
         
-        conn.close()
-        return candidates
+        # Default status if missing
+        if 'status' not in cand:
+            cand['status'] = 'applied'
+        
+        # Ensure total_score is present
+        if 'total_score' not in cand and cand.get('score'):
+            cand['total_score'] = cand['score']
+        
+        # Parse tags JSON if present
+        if cand.get('tags'):
+            try:
+                cand['tags'] = _json_loads(cand['tags'])
+            except:
+                cand['tags'] = []
+        else:
+            cand['tags'] = []
+        
+        # Notes is already a string, just ensure it exists
+        if not cand.get('notes'):
+            cand['notes'] = ''
+        
+        # Stored resume parse (see update_parsed_resume)
+        if cand.get('parsed_resume'):
+            try:
+                cand['parsed_resume'] = _json_loads(cand['parsed_resume'])
+            except:
+                cand['parsed_resume'] = None
+            
+        return cand
     
     def update_status(self, candidate_id: str, new_status: str) -> bool:
         """Update the status of a candidate in raw_data"""
@@ -455,7 +562,7 @@ class StorageService:
             
         try:
             raw_data_str = row[0] if self.is_postgres else row['raw_data']
-            raw_data = json.loads(raw_data_str) if raw_data_str else {}
+            raw_data = _json_loads(raw_data_str) if raw_data_str else {}
             
             # 2. Update status
             raw_data['status'] = new_status
@@ -492,7 +599,8 @@ class StorageService:
         
         if email and job_id:
             existing = self.check_duplicate_application(email=email, job_id=job_id)
-            if existing:
+            # Saving over the candidate's own row (e.g. the scored result of a pending application) is an update
+            if existing and existing.get('id') != candidate_data['id']:
                 print(f"⚠️ Duplicate blocked: {email} already applied to job {job_id}")
                 # Return the existing candidate data instead
                 return existing
@@ -502,7 +610,10 @@ class StorageService:
         
         skills_json = json.dumps(candidate_data.get('skills', {}))
         answers_json = json.dumps(candidate_data.get('answers', {}))
-        raw_data_json = json.dumps(candidate_data)
+        # The resume parse has its own column rather than a second copy in raw_data
+        parsed_resume = candidate_data.get('parsed_resume')
+        parsed_resume_json = json.dumps(parsed_resume) if parsed_resume else None
+        raw_data_json = json.dumps({k: v for k, v in candidate_data.items() if k != 'parsed_resume'})
         
         values = (
             candidate_data['id'],
@@ -517,13 +628,14 @@ class StorageService:
             candidate_data.get('total_score', 0),
             skills_json,
             answers_json,
-            raw_data_json
+            raw_data_json,
+            parsed_resume_json
         )
         
         if self.is_postgres:
             cursor.execute('''
-                INSERT INTO candidates (id, job_id, name, email, phone, resume_url, linkedin_url, job_description, timestamp, score, skills, answers, raw_data)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                INSERT INTO candidates (id, job_id, name, email, phone, resume_url, linkedin_url, job_description, timestamp, score, skills, answers, raw_data, parsed_resume)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                 ON CONFLICT (id) DO UPDATE SET
                     job_id = EXCLUDED.job_id,
                     name = EXCLUDED.name,
@@ -536,12 +648,13 @@ class StorageService:
                     score = EXCLUDED.score,
                     skills = EXCLUDED.skills,
                     answers = EXCLUDED.answers,
-                    raw_data = EXCLUDED.raw_data
+                    raw_data = EXCLUDED.raw_data,
+                    parsed_resume = COALESCE(EXCLUDED.parsed_resume, candidates.parsed_resume)
             ''', values)
         else:
             cursor.execute('''
-                INSERT OR REPLACE INTO candidates (id, job_id, name, email, phone, resume_url, linkedin_url, job_description, timestamp, score, skills, answers, raw_data)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                INSERT OR REPLACE INTO candidates (id, job_id, name, email, phone, resume_url, linkedin_url, job_description, timestamp, score, skills, answers, raw_data, parsed_resume)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', values)
             
         conn.commit()
@@ -865,7 +978,7 @@ class StorageService:
                 # Also update raw_data
                 raw_data = c.get('raw_data') or {}
                 if isinstance(raw_data, str):
-                    raw_data = json.loads(raw_data)
+                    raw_data = _json_loads(raw_data)
                 raw_data['job_id'] = target_job['id']
                 
                 if self.is_postgres:
@@ -908,6 +1021,26 @@ class StorageService:
             conn.close()
             return False
 
+    def update_parsed_resume(self, candidate_id: str, parsed_resume: Dict) -> bool:
+        """Store a candidate's resume parse, so manual reprocessing can skip download and parsing"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            parsed_json = json.dumps(parsed_resume)
+            if self.is_postgres:
+                cursor.execute('UPDATE candidates SET parsed_resume = %s WHERE id = %s', (parsed_json, candidate_id))
+            else:
+                cursor.execute('UPDATE candidates SET parsed_resume = ? WHERE id = ?', (parsed_json, candidate_id))
+            
+            conn.commit()
+            conn.close()
+            return True
+        except Exception as e:
+            print(f"Error updating parsed resume: {e}")
+            conn.close()
+            return False
+
     def update_candidate_tags(self, candidate_id: str, tags: list) -> bool:
         """Update tags for a candidate"""
         conn = self._get_connection()
@@ -1000,7 +1133,7 @@ class StorageService:
             status_counts = {'applied': 0, 'interview_scheduled': 0, 'rejected': 0, 'pending': 0}
             for row in rows:
                 try:
-                    raw = json.loads(dict(row).get('raw_data', '{}'))
+                    raw = _json_loads(dict(row).get('raw_data', '{}'))
                     status = raw.get('status', 'applied')
                     if status in ['processed', 'pending']:
                         status = 'applied'
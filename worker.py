@@ -0,0 +1,53 @@
+"""
+Application worker - processes webhook applications queued in Redis
+
+Run alongside the web service when APPLICATION_WORKER=1 is set for both:
+    python worker.py
+
+The webhook saves each application as 'pending' and queues it, as does the
+dashboard's manual reprocess (/api/process/<id>); this worker downloads,
+parses, scores and saves it. An item is popped before it is processed, so one
+lost to a crash or redeploy leaves its application 'pending'; importing app starts
+the sweep that requeues applications pending for over STALE_PENDING_MINUTES
+(once each; after that they can be reprocessed from the dashboard, /api/process/<id>).
+Requires Upstash Redis (UPSTASH_REDIS_REST_URL / UPSTASH_REDIS_REST_TOKEN).
+Admin notifications still waiting for their digest are sent when the worker
+exits (app.py registers email_service.shutdown with atexit).
+"""
+import logging
+import os
+import time
+
+from app import APPLICATION_QUEUE, cache_service, process_application_background
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait when the queue is empty (each poll is one Redis command)
+POLL_INTERVAL = float(os.environ.get('WORKER_POLL_SECONDS', 5))
+
+
+def run():
+    if not cache_service.is_redis:
+        raise SystemExit("❌ The application worker needs Upstash Redis (set UPSTASH_REDIS_REST_URL/TOKEN)")
+
+    logger.info("👷 Application worker started (queue: %s)", APPLICATION_QUEUE)
+    while True:
+        item = cache_service.dequeue(APPLICATION_QUEUE)
+        if not item:
+            time.sleep(POLL_INTERVAL)
+            continue
+
+        candidate_id = item.get('candidate_id')
+        logger.info("👷 Processing application %s", candidate_id)
+        try:
+            process_application_background(
+                item.get('data') or {}, candidate_id, item.get('base_url'),
+                skip_emails=item.get('skip_emails', False),
+                parsed_resume=item.get('parsed_resume')
+            )
+        except Exception as e:
+            logger.error("❌ Worker failed to process %s: %s", candidate_id, e)
+
+
+if __name__ == '__main__':
+    run()